@@ -1,47 +1,20 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+from extract import extract_workbook, breakdown_rows
+from validation import summary, to_json, validate, workbook_frame
 
-# load data in annual-unemployment-region
-UK_gender = pd.read_excel('annual-unemployment-region.xlsx', sheet_name='Gender', header=[0, 1], index_col=0, nrows=20).dropna(axis=1, how='all')
-LDN_gender =  pd.read_excel('annual-unemployment-region.xlsx', sheet_name='Gender', header=[0, 1], index_col=0, skiprows=23).dropna(axis=1, how='all')
-UK_dis =  pd.read_excel('annual-unemployment-region.xlsx', sheet_name='Disability', header=[0, 1], index_col=0, nrows=20).dropna(axis=1, how='all')
-LDN_dis =  pd.read_excel('annual-unemployment-region.xlsx', sheet_name='Disability', header=[0, 1], index_col=0, skiprows=23).dropna(axis=1, how='all')
-UK_eth = pd.read_excel('annual-unemployment-region.xlsx', sheet_name='Ethnicity', header=[0, 1], index_col=0, nrows=20).dropna(axis=1, how='all')
-LDN_eth = pd.read_excel('annual-unemployment-region.xlsx', sheet_name='Ethnicity', header=[0, 1], index_col=0, skiprows=23).dropna(axis=1, how='all')
-LDN_eth = LDN_eth.iloc[:-3,:]
+# load data in annual-unemployment-region (each sheet holds a UK block then a London block)
+frames = extract_workbook('annual-unemployment-region.xlsx')
+UK_gender, LDN_gender = frames['Gender']
 
-def check_data_quality(df):
-    df = df.replace('-', pd.NA)
-    missing_values_per_row = df.isnull().sum(axis=1)
-    
-    problematic_rows = missing_values_per_row[missing_values_per_row > 0]
-    print(f"Rows with more than 0 missing values:")
-    if not problematic_rows.empty:
-        print(problematic_rows)
-    else:
-        print("No rows with excessive missing values.\n")
+# check every sheet at once against the data-quality rules
+values = workbook_frame(frames)
+report = validate(values)
+print(summary(report))
+with open('data_quality.json', 'w') as f:
+    f.write(to_json(report))
 
-df_list = [UK_gender, LDN_gender, UK_dis, LDN_dis, UK_eth, LDN_eth]
-name = ['UK_gender', 'LDN_gender', 'UK_dis', 'LDN_dis', 'UK_eth', 'LDN_eth']
-for i in range(6):
-    print(name[i])
-    check_data_quality(df_list[i])
-
-UK_dis = UK_dis.dropna(axis=0, how='all')
-LDN_dis = LDN_dis.dropna(axis=0, how='all')
-
-def explore_data(df):
-    print('df info: ', df.info())
-    #print(df.shape)
-    #print(df.columns)
-    #print('df type: ', df.dtypes)
-    print(df.describe())
-    
-
-for i in range(6):
-    print('##################################')
-    print(name[i])
-    explore_data(df_list[i])
+print(values.groupby(['dimension', 'region'])[['rate', 'conf']].describe())
 
 
 
@@ -79,4 +52,7 @@ def plot(df):
     plt.savefig('q3.png', bbox_inches='tight')
 plot(ldn_data)
 
-
+# long-format disability and ethnicity rates for the generic breakdown table
+q3 = breakdown_rows(frames)
+q3.to_csv('q3_breakdown.csv', index=False)
+print(q3.groupby(['dimension', 'region']).size())
@@ -1,13 +1,31 @@
 import pandas as pd
 import sqlite3
 import os
+import time
+import argparse
+import hashlib
+import sys
 
-def create_database():
+import ingest
+import snapshot_file
+import validation
+
+DB_PATH = 'unemployment.db'
+
+# Bump whenever the schema changes so --incremental falls back to a rebuild
+SCHEMA_VERSION = 7
+
+def create_database(db_path=DB_PATH):
     """Create database and required tables"""
-    if os.path.exists('unemployment.db'):
-        os.remove('unemployment.db')
+    if os.path.exists(db_path):
+        os.remove(db_path)
     
-    conn = sqlite3.connect('unemployment.db')
+    conn = sqlite3.connect(db_path)
+    create_schema(conn)
+    return conn
+
+def create_schema(conn):
+    """Create any missing tables and base dimension rows"""
     cursor = conn.cursor()
 
     # Create time period table
@@ -34,116 +52,643 @@ def create_database():
     )
     ''')
 
-    # Create unemployment rate by gender table
+    # The fact tables are WITHOUT ROWID and clustered on their natural key,
+    # in the order the dashboard reads them, so each read is a range scan of
+    # the table itself with the rates inline and no separate index or sort.
+
+    # Create unemployment rate by gender table, one range per gender
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS UnemploymentRateByGender (
-        ID INTEGER PRIMARY KEY AUTOINCREMENT,
-        PeriodID INTEGER,
-        GenderID INTEGER,
+        GenderID INTEGER NOT NULL,
+        PeriodID INTEGER NOT NULL,
         Rate FLOAT,
+        PRIMARY KEY (GenderID, PeriodID),
         FOREIGN KEY (PeriodID) REFERENCES TimePeriod(PeriodID),
         FOREIGN KEY (GenderID) REFERENCES Gender(GenderID)
-    )
+    ) WITHOUT ROWID
     ''')
 
-    # Create unemployment rate by region table
+    # Create unemployment rate by region table, every region of a period
+    # side by side
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS UnemploymentRateByRegion (
-        ID INTEGER PRIMARY KEY AUTOINCREMENT,
-        PeriodID INTEGER,
-        RegionID INTEGER,
+        PeriodID INTEGER NOT NULL,
+        RegionID INTEGER NOT NULL,
         Rate FLOAT,
+        PRIMARY KEY (PeriodID, RegionID),
         FOREIGN KEY (PeriodID) REFERENCES TimePeriod(PeriodID),
         FOREIGN KEY (RegionID) REFERENCES Region(RegionID)
+    ) WITHOUT ROWID
+    ''')
+
+    # Create breakdown table, one row per (dimension, category) such as
+    # ('Disability', 'Unemployment rate aged 16-64 - disabled')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Breakdown (
+        BreakdownID INTEGER PRIMARY KEY AUTOINCREMENT,
+        Dimension TEXT NOT NULL,
+        Category TEXT NOT NULL,
+        UNIQUE (Dimension, Category)
     )
     ''')
 
+    # Create generic long-format rate table for every breakdown dimension,
+    # one range per category and region
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS UnemploymentRateByBreakdown (
+        BreakdownID INTEGER NOT NULL,
+        RegionID INTEGER NOT NULL,
+        PeriodID INTEGER NOT NULL,
+        Rate FLOAT,
+        ConfidenceInterval FLOAT,
+        PRIMARY KEY (BreakdownID, RegionID, PeriodID),
+        FOREIGN KEY (PeriodID) REFERENCES TimePeriod(PeriodID),
+        FOREIGN KEY (RegionID) REFERENCES Region(RegionID),
+        FOREIGN KEY (BreakdownID) REFERENCES Breakdown(BreakdownID)
+    ) WITHOUT ROWID
+    ''')
+
+    # Create gender pivot view, one row per period with the male and female
+    # rates side by side. Male rows are one primary key range in PeriodID
+    # order and each female rate is a single primary key lookup, so the
+    # dashboard reads it in one range scan with no sort.
+    cursor.execute('''
+    CREATE VIEW IF NOT EXISTS GenderRate AS
+    SELECT m.PeriodID, tp.PeriodName,
+           CAST(substr(tp.PeriodName, -4) AS INTEGER) AS Year,
+           m.Rate AS Male, f.Rate AS Female
+    FROM UnemploymentRateByGender m
+    JOIN TimePeriod tp ON m.PeriodID = tp.PeriodID
+    LEFT JOIN UnemploymentRateByGender f
+        ON f.PeriodID = m.PeriodID
+       AND f.GenderID = (SELECT GenderID FROM Gender WHERE GenderName = 'Female')
+    WHERE m.GenderID = (SELECT GenderID FROM Gender WHERE GenderName = 'Male')
+    ''')
+
+    # Create trend metrics table, materialized from the fact tables at build
+    # time. Clustered on (Metric, PeriodID) so one metric is a single range read.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS TrendMetrics (
+        Metric TEXT NOT NULL,
+        PeriodID INTEGER NOT NULL,
+        Value FLOAT,
+        PRIMARY KEY (Metric, PeriodID),
+        FOREIGN KEY (PeriodID) REFERENCES TimePeriod(PeriodID)
+    ) WITHOUT ROWID
+    ''')
+
+    # Create source file table, used by --incremental to skip unchanged CSVs.
+    # Keyed by file name, so WITHOUT ROWID avoids a separate PK index.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS SourceFile (
+        FileName TEXT PRIMARY KEY,
+        ContentHash TEXT NOT NULL,
+        LoadedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID
+    ''')
+
     # Insert base data
-    cursor.execute("INSERT INTO Gender (GenderName) VALUES ('Male')")
-    cursor.execute("INSERT INTO Gender (GenderName) VALUES ('Female')")
-    cursor.execute("INSERT INTO Region (RegionName) VALUES ('UK')")
-    cursor.execute("INSERT INTO Region (RegionName) VALUES ('LDN')")
+    cursor.execute("INSERT OR IGNORE INTO Gender (GenderName) VALUES ('Male')")
+    cursor.execute("INSERT OR IGNORE INTO Gender (GenderName) VALUES ('Female')")
+    cursor.execute("INSERT OR IGNORE INTO Region (RegionName) VALUES ('UK')")
+    cursor.execute("INSERT OR IGNORE INTO Region (RegionName) VALUES ('LDN')")
 
+    cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
     conn.commit()
-    return conn
+
+def set_build_pragmas(conn):
+    """Trade durability for speed while the database is being built.
+
+    Only safe for a build that can simply be rerun if it is interrupted.
+    """
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA journal_mode = MEMORY')
+
+def lookup_ids(cursor, table, id_column, name_column):
+    """Return a {name: id} dict for a dimension table"""
+    cursor.execute(f'SELECT {name_column}, {id_column} FROM {table}')
+    return dict(cursor.fetchall())
+
+def upsert_names(cursor, table, id_column, name_column, names):
+    """Insert any new dimension members and return the {name: id} lookup"""
+    ids = lookup_ids(cursor, table, id_column, name_column)
+    new_names = [(name,) for name in pd.unique(names) if name not in ids]
+    if new_names:
+        cursor.executemany(f'INSERT INTO {table} ({name_column}) VALUES (?)', new_names)
+        print(f"{len(new_names)} new {table} row(s)")
+        ids = lookup_ids(cursor, table, id_column, name_column)
+    return ids
+
+def upsert_periods(cursor, period_names):
+    """Insert any new time periods in one batch and return their IDs
+
+    Every query orders periods by PeriodID, so new periods are inserted in
+    year order and must come after every period already loaded. An earlier
+    period, e.g. a backfilled year in an --incremental update, raises
+    ValueError; the database has to be rebuilt to take it.
+    """
+    ids = lookup_ids(cursor, 'TimePeriod', 'PeriodID', 'PeriodName')
+    new = pd.Series(pd.unique(period_names))
+    new = new[~new.isin(list(ids))]
+    years = validation.period_years(new)
+    if ids and not new.empty:
+        latest = validation.period_years(pd.Series(list(ids))).max()
+        earlier = new[years <= latest]
+        if not earlier.empty:
+            raise ValueError(f"period {earlier.iloc[0]!r} is not after the "
+                             f"periods already loaded; rebuild the database "
+                             f"without --incremental")
+    new = new.loc[years.sort_values(kind='stable').index]
+    return upsert_names(cursor, 'TimePeriod', 'PeriodID', 'PeriodName', new)
+
+def fact_rows(df, period_ids, column_ids):
+    """Reshape a wide CSV frame into (PeriodID, DimensionID, Rate) tuples
+
+    Args:
+        df (pd.DataFrame): Frame with a 'time' column and one rate column
+            per dimension member
+        period_ids (dict): PeriodName to PeriodID lookup
+        column_ids (dict): Rate column name to dimension ID
+
+    Returns:
+        list: Rows ordered by period, then by column order in column_ids
+    """
+    period_id = df['time'].map(period_ids)
+    long = pd.concat([
+        pd.DataFrame({'PeriodID': period_id, 'DimensionID': dimension_id,
+                      'Rate': df[column]})
+        for column, dimension_id in column_ids.items()
+    ]).sort_index(kind='stable')
+    return list(long.itertuples(index=False, name=None))
+
+def upsert_rates(cursor, fact_table, dimension_column, rows):
+    """Upsert (PeriodID, DimensionID, Rate) rows into a fact table
+
+    Rows are upserted against the table's (PeriodID, dimension) primary
+    key, and only rows whose rate actually changed are rewritten.
+
+    Returns:
+        int: Number of fact rows inserted or updated
+    """
+    changes_before = cursor.connection.total_changes
+    cursor.executemany(f'''
+        INSERT INTO {fact_table} (PeriodID, {dimension_column}, Rate)
+        VALUES (?, ?, ?)
+        ON CONFLICT (PeriodID, {dimension_column})
+        DO UPDATE SET Rate = excluded.Rate WHERE Rate IS NOT excluded.Rate
+    ''', rows)
+    return cursor.connection.total_changes - changes_before
+
+def import_rates(conn, csv_file_path, fact_table, dimension_column, column_ids):
+    """Bulk load one wide CSV into a fact table inside a single transaction
+
+    Only rows whose rate actually changed are rewritten, so the same loader
+    serves both a fresh build and an incremental update.
+
+    Returns:
+        int: Number of fact rows inserted or updated
+    """
+    start = time.perf_counter()
+    df = pd.read_csv(csv_file_path)
+    cursor = conn.cursor()
+    period_ids = upsert_periods(cursor, df['time'])
+    rows = fact_rows(df, period_ids, column_ids)
+    changed = upsert_rates(cursor, fact_table, dimension_column, rows)
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    print(f"{len(rows)} rows into {fact_table} in {elapsed:.3f}s "
+          f"({len(rows) / max(elapsed, 1e-9):,.0f} rows/sec, {changed} changed)")
+    return changed
 
 def import_gender_data(conn, csv_file_path):
     """Import unemployment rate data by gender"""
     try:
-        df = pd.read_csv(csv_file_path)
-        cursor = conn.cursor()
-
-        for _, row in df.iterrows():
-            # Insert time period
-            cursor.execute('INSERT OR IGNORE INTO TimePeriod (PeriodName) VALUES (?)', 
-                         (row['time'],))
-            cursor.execute('SELECT PeriodID FROM TimePeriod WHERE PeriodName = ?', 
-                         (row['time'],))
-            period_id = cursor.fetchone()[0]
-
-            # Get gender IDs
-            cursor.execute('SELECT GenderID FROM Gender WHERE GenderName = ?', ('Male',))
-            male_id = cursor.fetchone()[0]
-            cursor.execute('SELECT GenderID FROM Gender WHERE GenderName = ?', ('Female',))
-            female_id = cursor.fetchone()[0]
-
-            # Insert male unemployment rate
-            cursor.execute('''
-                INSERT INTO UnemploymentRateByGender (PeriodID, GenderID, Rate)
-                VALUES (?, ?, ?)
-            ''', (period_id, male_id, row['male']))
-
-            # Insert female unemployment rate
-            cursor.execute('''
-                INSERT INTO UnemploymentRateByGender (PeriodID, GenderID, Rate)
-                VALUES (?, ?, ?)
-            ''', (period_id, female_id, row['female']))
-
-        conn.commit()
+        gender_ids = lookup_ids(conn.cursor(), 'Gender', 'GenderID', 'GenderName')
+        import_rates(conn, csv_file_path, 'UnemploymentRateByGender', 'GenderID',
+                     {'male': gender_ids['Male'], 'female': gender_ids['Female']})
         print("Gender unemployment rate data imported successfully!")
+        return True
 
     except Exception as e:
         print(f"Error importing data: {str(e)}")
         conn.rollback()
+        return False
 
 def import_region_data(conn, csv_file_path):
     """Import unemployment rate data by region"""
     try:
+        region_ids = lookup_ids(conn.cursor(), 'Region', 'RegionID', 'RegionName')
+        import_rates(conn, csv_file_path, 'UnemploymentRateByRegion', 'RegionID',
+                     {'UK': region_ids['UK'], 'LDN': region_ids['LDN']})
+        print("Regional unemployment rate data imported successfully!")
+        return True
+
+    except Exception as e:
+        print(f"Error importing data: {str(e)}")
+        conn.rollback()
+        return False
+
+def breakdown_fact_rows(cursor, df):
+    """Upsert a long breakdown frame's dimension members and return its rows
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the loading transaction
+        df (pd.DataFrame): time, region, dimension, category, rate and conf
+
+    Returns:
+        list: (PeriodID, RegionID, BreakdownID, Rate, ConfidenceInterval)
+    """
+    period_ids = upsert_periods(cursor, df['time'])
+    region_ids = upsert_names(cursor, 'Region', 'RegionID', 'RegionName', df['region'])
+
+    pairs = df[['dimension', 'category']].drop_duplicates()
+    cursor.executemany('INSERT OR IGNORE INTO Breakdown (Dimension, Category) VALUES (?, ?)',
+                       list(pairs.itertuples(index=False, name=None)))
+    cursor.execute('SELECT Dimension, Category, BreakdownID FROM Breakdown')
+    breakdown_ids = {(dimension, category): breakdown_id
+                     for dimension, category, breakdown_id in cursor.fetchall()}
+
+    rows = pd.DataFrame({
+        'PeriodID': df['time'].map(period_ids),
+        'RegionID': df['region'].map(region_ids),
+        'BreakdownID': [breakdown_ids[key] for key in zip(df['dimension'], df['category'])],
+        'Rate': df['rate'],
+        'ConfidenceInterval': df['conf'],
+    })
+    return [
+        (int(period_id), int(region_id), int(breakdown_id), rate,
+         None if pd.isna(conf) else conf)
+        for period_id, region_id, breakdown_id, rate, conf
+        in rows.itertuples(index=False, name=None)
+    ]
+
+def upsert_breakdown_rates(cursor, rows):
+    """Upsert breakdown fact rows, rewriting only changed values
+
+    Returns:
+        int: Number of fact rows inserted or updated
+    """
+    changes_before = cursor.connection.total_changes
+    cursor.executemany('''
+        INSERT INTO UnemploymentRateByBreakdown
+            (PeriodID, RegionID, BreakdownID, Rate, ConfidenceInterval)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (PeriodID, RegionID, BreakdownID) DO UPDATE SET
+            Rate = excluded.Rate, ConfidenceInterval = excluded.ConfidenceInterval
+        WHERE Rate IS NOT excluded.Rate
+           OR ConfidenceInterval IS NOT excluded.ConfidenceInterval
+    ''', rows)
+    return cursor.connection.total_changes - changes_before
+
+def import_breakdown_data(conn, csv_file_path):
+    """Import long-format unemployment rates for any breakdown dimension
+
+    The CSV has one row per time, region, dimension and category with its
+    rate and confidence interval, so new dimensions need no schema change.
+    """
+    try:
+        start = time.perf_counter()
         df = pd.read_csv(csv_file_path)
         cursor = conn.cursor()
+        rows = breakdown_fact_rows(cursor, df)
+        changed = upsert_breakdown_rates(cursor, rows)
+        conn.commit()
+        elapsed = time.perf_counter() - start
+        print(f"{len(rows)} rows into UnemploymentRateByBreakdown in {elapsed:.3f}s "
+              f"({len(rows) / max(elapsed, 1e-9):,.0f} rows/sec, {changed} changed)")
+        print("Breakdown unemployment rate data imported successfully!")
+        return True
 
-        for _, row in df.iterrows():
-            # Insert time period
-            cursor.execute('INSERT OR IGNORE INTO TimePeriod (PeriodName) VALUES (?)', 
-                         (row['time'],))
-            cursor.execute('SELECT PeriodID FROM TimePeriod WHERE PeriodName = ?', 
-                         (row['time'],))
-            period_id = cursor.fetchone()[0]
-
-            # Get region IDs
-            cursor.execute('SELECT RegionID FROM Region WHERE RegionName = ?', ('UK',))
-            uk_id = cursor.fetchone()[0]
-            cursor.execute('SELECT RegionID FROM Region WHERE RegionName = ?', ('LDN',))
-            ldn_id = cursor.fetchone()[0]
-
-            # Insert UK unemployment rate
-            cursor.execute('''
-                INSERT INTO UnemploymentRateByRegion (PeriodID, RegionID, Rate)
-                VALUES (?, ?, ?)
-            ''', (period_id, uk_id, row['UK']))
-
-            # Insert London unemployment rate
-            cursor.execute('''
-                INSERT INTO UnemploymentRateByRegion (PeriodID, RegionID, Rate)
-                VALUES (?, ?, ?)
-            ''', (period_id, ldn_id, row['LDN']))
+    except Exception as e:
+        print(f"Error importing data: {str(e)}")
+        conn.rollback()
+        return False
+
+# Each source CSV with its importer and the label used in messages
+SOURCES = [
+    ('q1_gender.csv', import_gender_data, 'Gender'),
+    ('q2_region.csv', import_region_data, 'Region'),
+    ('q3_breakdown.csv', import_breakdown_data, 'Breakdown'),
+]
 
+def file_hash(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def loaded_hash(conn, csv_file_path):
+    """Hash of the CSV contents last loaded into the database, if any"""
+    row = conn.execute('SELECT ContentHash FROM SourceFile WHERE FileName = ?',
+                       (os.path.basename(csv_file_path),)).fetchone()
+    return row[0] if row else None
+
+def record_source(conn, file_name, content_hash, commit=True):
+    """Remember which version of a source file the database now reflects"""
+    conn.execute('''
+        INSERT INTO SourceFile (FileName, ContentHash) VALUES (?, ?)
+        ON CONFLICT (FileName) DO UPDATE SET
+            ContentHash = excluded.ContentHash, LoadedAt = CURRENT_TIMESTAMP
+    ''', (file_name, content_hash))
+    if commit:
         conn.commit()
-        print("Regional unemployment rate data imported successfully!")
+
+def load_sources(conn, incremental=False):
+    """Import every available source CSV
+
+    In incremental mode a CSV whose content hash matches the last load is
+    skipped entirely. Otherwise the periods of all CSVs are inserted up
+    front, in year order.
+
+    Returns:
+        tuple: (False if any import failed, number of CSVs loaded)
+    """
+    ok = True
+    loaded = 0
+    if not incremental:
+        # Number the periods of every source together, so one source's
+        # earlier periods are not appended after another's later ones
+        periods = [pd.read_csv(csv_file_path, usecols=['time'])['time']
+                   for csv_file_path, _, _ in SOURCES
+                   if os.path.exists(csv_file_path)]
+        if periods:
+            upsert_periods(conn.cursor(), pd.concat(periods))
+            conn.commit()
+    for csv_file_path, importer, label in SOURCES:
+        if not os.path.exists(csv_file_path):
+            print(f"{label} data file not found")
+            continue
+        content_hash = file_hash(csv_file_path)
+        if incremental and loaded_hash(conn, csv_file_path) == content_hash:
+            print(f"{csv_file_path} unchanged, skipping")
+            continue
+        if importer(conn, csv_file_path):
+            record_source(conn, os.path.basename(csv_file_path), content_hash)
+            loaded += 1
+        else:
+            ok = False
+    return ok, loaded
+
+def merge_workbook_values(conn, values):
+    """Write merged workbook values to every fact table in one transaction
+
+    Args:
+        conn (sqlite3.Connection): Database to load into; the caller commits
+        values (pd.DataFrame): ingest.merge_values() of the parsed workbooks
+
+    Returns:
+        int: Number of fact rows inserted or updated
+    """
+    facts = ingest.fact_frames(values)
+    cursor = conn.cursor()
+    period_ids = upsert_periods(cursor, values['time'])
+    gender_ids = lookup_ids(cursor, 'Gender', 'GenderID', 'GenderName')
+    region_ids = upsert_names(cursor, 'Region', 'RegionID', 'RegionName',
+                              facts['region']['region'])
+
+    gender, region = facts['gender'], facts['region']
+    changed = upsert_rates(cursor, 'UnemploymentRateByGender', 'GenderID', list(zip(
+        gender['time'].map(period_ids).tolist(),
+        gender['gender'].map(gender_ids).tolist(),
+        gender['rate'].tolist())))
+    changed += upsert_rates(cursor, 'UnemploymentRateByRegion', 'RegionID', list(zip(
+        region['time'].map(period_ids).tolist(),
+        region['region'].map(region_ids).tolist(),
+        region['rate'].tolist())))
+    changed += upsert_breakdown_rates(
+        cursor, breakdown_fact_rows(cursor, facts['breakdown']))
+    return changed
+
+def load_workbooks(conn, paths, incremental=False, validate=True,
+                   report_path=None, workers=None):
+    """Parse workbooks in a process pool and load them in one transaction
+
+    Every workbook is hashed, parsed and checked against the data-quality
+    rules in parallel (see ingest.py). Nothing is written unless all of them
+    pass, and the rates of all workbooks are then written in a single
+    transaction together with their SourceFile hashes.
+
+    Args:
+        conn (sqlite3.Connection): Database to load into
+        paths (list): Workbooks, or directories to search for them
+        incremental (bool): Skip workbooks whose hash matches the last load,
+            unless they sort after a changed one and may share its rates
+        validate (bool): Run the data-quality rules over each workbook
+        report_path (str): Optional file for the per-workbook JSON reports
+        workers (int): Parser processes; defaults to one per CPU
+
+    Returns:
+        tuple: (False if any workbook failed, number of workbooks loaded)
+    """
+    start = time.perf_counter()
+    workbooks = ingest.discover(paths)
+    if not workbooks:
+        print(f"No workbooks found in {', '.join(paths)}")
+        return False, 0
+    known_hashes = dict(conn.execute(
+        'SELECT FileName, ContentHash FROM SourceFile')) if incremental else {}
+    results = ingest.parse_workbooks(workbooks, known_hashes, validate, workers)
+    if incremental:
+        results = ingest.reparse_later(results, validate, workers)
+    print(ingest.summary(results))
+    print(f"{len(results)} workbook(s) parsed in {time.perf_counter() - start:.3f}s")
+    if report_path:
+        with open(report_path, 'w') as f:
+            f.write(validation.to_json(ingest.validation_reports(results)))
+
+    failed = [result for result in results if result.status in ('invalid', 'error')]
+    if failed:
+        print(f"{len(failed)} workbook(s) failed, nothing loaded")
+        return False, 0
+    parsed = [result for result in results if result.status == 'parsed']
+    if not parsed:
+        return True, 0
+
+    try:
+        start = time.perf_counter()
+        changed = merge_workbook_values(conn, ingest.merge_values(parsed))
+        for result in parsed:
+            record_source(conn, result.name, result.content_hash, commit=False)
+        conn.commit()
+        print(f"{len(parsed)} workbook(s) merged in {time.perf_counter() - start:.3f}s "
+              f"({changed} rows changed)")
+        return True, len(parsed)
 
     except Exception as e:
         print(f"Error importing data: {str(e)}")
         conn.rollback()
+        return False, 0
+
+def pivot_rates(conn, fact_table, dimension_table, dimension_column, name_column):
+    """Fact table as a PeriodID x dimension-member frame of rates"""
+    df = pd.read_sql_query(f'''
+        SELECT f.PeriodID, d.{name_column} AS Name, f.Rate
+        FROM {fact_table} f
+        JOIN {dimension_table} d ON f.{dimension_column} = d.{dimension_column}
+    ''', conn)
+    return df.pivot(index='PeriodID', columns='Name', values='Rate')
+
+def build_trend_metrics(conn):
+    """Materialize the trend comparison series into TrendMetrics
+
+    Metrics:
+        gender_gap: male minus female rate
+        regional_var: standard deviation of the regional rates
+        london_national: London rate minus the average across regions
+    """
+    gender = pivot_rates(conn, 'UnemploymentRateByGender', 'Gender',
+                         'GenderID', 'GenderName')
+    region = pivot_rates(conn, 'UnemploymentRateByRegion', 'Region',
+                         'RegionID', 'RegionName')
+    metrics = {}
+    if {'Male', 'Female'} <= set(gender.columns):
+        metrics['gender_gap'] = gender['Male'] - gender['Female']
+    if not region.empty:
+        metrics['regional_var'] = region.std(axis=1)
+    if 'LDN' in region.columns:
+        metrics['london_national'] = region['LDN'] - region.mean(axis=1)
+
+    rows = [
+        (metric, int(period_id), None if pd.isna(value) else float(value))
+        for metric, series in metrics.items()
+        for period_id, value in series.items()
+    ]
+    conn.execute('DELETE FROM TrendMetrics')
+    conn.executemany('INSERT INTO TrendMetrics (Metric, PeriodID, Value) VALUES (?, ?, ?)',
+                     rows)
+    conn.commit()
+    print(f"{len(rows)} trend metric values materialized")
+
+def analyze_database(conn):
+    """Refresh planner statistics once the data is loaded"""
+    conn.execute('ANALYZE')
+    conn.commit()
+
+def write_snapshot(db_path=DB_PATH, path=None):
+    """Write the dashboard's memory-mapped snapshot of a finished database
+
+    path defaults to the snapshot beside db_path; a build still under a
+    temporary name passes the snapshot path of the file it will replace.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        path = snapshot_file.write_snapshot(conn, db_path, path)
+    finally:
+        conn.close()
+    print(f"Snapshot written to {path} ({os.path.getsize(path):,} bytes)")
+
+def export_static(output_dir, db_path=DB_PATH):
+    """Render the static dashboard bundle from the finished database"""
+    # Imports the whole app, so only when an export was asked for
+    import data_access
+    import static_export
+
+    data_access.configure(db_path)
+    manifest = static_export.export(output_dir)
+    if manifest is None:
+        print(f"{output_dir} is already up to date")
+    else:
+        print(f"Exported {len(manifest['figures'])} figures to {output_dir}")
+
+def can_update_in_place(db_path=DB_PATH):
+    """True if an existing database has the current schema"""
+    if not os.path.exists(db_path):
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+    finally:
+        conn.close()
+
+def validate_sources(report_path=None):
+    """Check the source CSVs against the data-quality rules
+
+    Args:
+        report_path (str): Optional file to write the JSON report to
+
+    Returns:
+        bool: False if any error-level rule failed
+    """
+    report = validation.validate(validation.source_frame(
+        *(csv_file_path for csv_file_path, _, _ in SOURCES)))
+    print(validation.summary(report))
+    if report_path:
+        with open(report_path, 'w') as f:
+            f.write(validation.to_json(report))
+    return report['passed']
+
+def rebuild_database(db_path=DB_PATH, fast_build=False, validate=True,
+                     report_path=None, workbooks=None, workers=None):
+    """Build a fresh database beside db_path and atomically swap it in
+
+    Readers keep seeing the old file until os.replace() switches them over,
+    so the dashboard never opens a missing or half-built database. Sources
+    failing validation leave db_path untouched. With workbooks, the
+    database is built from those workbooks instead of the source CSVs.
+
+    Returns:
+        bool: True if the new database replaced db_path
+    """
+    if workbooks is None and validate and not validate_sources(report_path):
+        print(f"Validation failed, {db_path} left unchanged")
+        return False
+    tmp_path = db_path + '.tmp'
+    conn = create_database(tmp_path)
+    try:
+        if fast_build:
+            set_build_pragmas(conn)
+        if workbooks is None:
+            ok, _ = load_sources(conn)
+        else:
+            ok, _ = load_workbooks(conn, workbooks, validate=validate,
+                                   report_path=report_path, workers=workers)
+        if ok:
+            build_trend_metrics(conn)
+            analyze_database(conn)
+        conn.close()
+        if not ok:
+            print(f"Build failed, {db_path} left unchanged")
+            return False
+        # Written before the swap: until then the new snapshot does not match
+        # the live database and readers fall back to SQLite, and afterwards
+        # it already matches the new one
+        write_snapshot(tmp_path, snapshot_file.snapshot_path(db_path))
+        os.replace(tmp_path, db_path)
+    finally:
+        # Also reached when the build raises; a half-built file must not linger
+        conn.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return True
+
+def update_database(db_path=DB_PATH, validate=True, report_path=None,
+                    workbooks=None, workers=None):
+    """Apply changed source CSVs, or workbooks, to an existing database in place
+
+    Returns:
+        bool: False if validation or any import failed
+    """
+    if workbooks is None and validate and not validate_sources(report_path):
+        print(f"Validation failed, {db_path} left unchanged")
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        if workbooks is None:
+            ok, loaded = load_sources(conn, incremental=True)
+        else:
+            ok, loaded = load_workbooks(conn, workbooks, incremental=True,
+                                        validate=validate,
+                                        report_path=report_path, workers=workers)
+        if loaded:
+            build_trend_metrics(conn)
+            analyze_database(conn)
+    finally:
+        conn.close()
+    if loaded:
+        write_snapshot(db_path)
+    return ok
 
 def print_database_content(db_path='unemployment.db'):
     """Print database contents"""
@@ -176,31 +721,67 @@ def print_database_content(db_path='unemployment.db'):
         results = cursor.fetchall()
         for row in results:
             print(f"Period: {row[0]}, Region: {row[1]}, Rate: {row[2]}%")
+
+        print("\n=== Unemployment Rate by Breakdown ===")
+        query = '''
+        SELECT tp.PeriodName, r.RegionName, b.Dimension, b.Category, ub.Rate, ub.ConfidenceInterval
+        FROM UnemploymentRateByBreakdown ub
+        JOIN TimePeriod tp ON ub.PeriodID = tp.PeriodID
+        JOIN Region r ON ub.RegionID = r.RegionID
+        JOIN Breakdown b ON ub.BreakdownID = b.BreakdownID
+        ORDER BY b.Dimension, b.Category, r.RegionName, tp.PeriodName
+        '''
+        cursor.execute(query)
+        results = cursor.fetchall()
+        for row in results:
+            print(f"Period: {row[0]}, Region: {row[1]}, {row[2]}: {row[3]}, "
+                  f"Rate: {row[4]}% (+/- {row[5]})")
             
         conn.close()
         
     except Exception as e:
         print(f"Error reading database: {str(e)}")
 
-def main():
-    # Create database
-    conn = create_database()
-    
-    # Import gender data
-    if os.path.exists('q1_gender.csv'):
-        import_gender_data(conn, 'q1_gender.csv')
-    else:
-        print("Gender data file not found")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Build unemployment.db from the prepared CSV files or the workbooks')
+    parser.add_argument('--fast-build', action='store_true',
+                        help='use synchronous=OFF and an in-memory journal while building')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only load CSVs that changed since the last build, '
+                             'rebuilding if the database is missing or outdated')
+    parser.add_argument('--skip-validation', action='store_true',
+                        help='load the CSVs without running the data-quality checks')
+    parser.add_argument('--report', metavar='PATH',
+                        help='write the data-quality report to PATH as JSON')
+    parser.add_argument('--workbooks', nargs='+', metavar='PATH',
+                        help='load these workbooks, or every workbook in these '
+                             'directories, instead of the CSV files')
+    parser.add_argument('--workers', type=int,
+                        help='processes parsing --workbooks (default: one per CPU)')
+    parser.add_argument('--export', metavar='DIR',
+                        help='render the static dashboard into DIR after a '
+                             'successful build (see static_export.py)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
 
-    # Import region data
-    if os.path.exists('q2_region.csv'):
-        import_region_data(conn, 'q2_region.csv')
+    validate = not args.skip_validation
+    if args.incremental and can_update_in_place():
+        ok = update_database(validate=validate, report_path=args.report,
+                             workbooks=args.workbooks, workers=args.workers)
     else:
-        print("Region data file not found")
-    conn.close()
+        ok = rebuild_database(fast_build=args.fast_build, validate=validate,
+                              report_path=args.report, workbooks=args.workbooks,
+                              workers=args.workers)
+
+    if ok and args.export:
+        export_static(args.export)
 
     print("Database contents:")
     print_database_content()
+    return 0 if ok else 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Background execution for expensive chart callbacks.
+
+With the optional ``diskcache`` and ``multiprocess`` packages installed,
+callbacks for charts marked ``background`` in the registry run through
+Dash's DiskcacheManager: the work happens in a separate process, so it never
+blocks a server thread, the browser shows its progress, and a job is
+cancelled when the same callback is triggered again. Results are stored on
+disk keyed by the callback inputs and the data version, so every user asking
+for the same figures reuses one computation.
+
+Without those packages the same callbacks run in the request thread.
+"""
+import os
+
+import dashboard_data
+
+# Absolute, so jobs find the cache whatever the working directory is later
+CACHE_DIR = os.path.abspath(os.environ.get(
+    'BACKGROUND_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 '.background_cache')))
+# Seconds a finished result stays reusable
+EXPIRE = int(os.environ.get('BACKGROUND_CACHE_EXPIRE', '86400'))
+
+
+def data_version():
+    """Cache key component tying stored results to the loaded data."""
+    return str(dashboard_data.store.get().version)
+
+
+def make_manager(cache_dir=CACHE_DIR):
+    """A DiskcacheManager for background callbacks, or None if unavailable."""
+    try:
+        import diskcache
+        import multiprocess  # noqa: F401 - DiskcacheManager runs jobs with it
+    except ImportError:
+        return None
+    from dash import DiskcacheManager
+    return DiskcacheManager(diskcache.Cache(cache_dir),
+                            cache_by=[data_version], expire=EXPIRE)
@@ -0,0 +1,360 @@
+"""Load test for the dashboard's callback endpoint.
+
+Starts the Dash app in-process on a threaded WSGI server and drives
+``/_dash-update-component`` with every request the dashboard makes (the
+page load and each dropdown value) from concurrent clients. Reports
+p50/p95/p99 latency per callback and overall throughput, and fails when a
+result is worse than the limits in benchmark_thresholds.json::
+
+    python benchmark.py
+    python benchmark.py --requests 500 --concurrency 16
+    python benchmark.py --cold --thresholds ''   # rebuild every figure
+
+Absolute timings depend on the machine, so the limits are relative to a
+baseline run on the same machine with the same settings, kept in
+benchmark_baseline.json (not committed). Record it with
+``--save-baseline``, e.g. on the target branch before benchmarking a change;
+a run without a baseline for this machine and these settings fails rather
+than passing unchecked::
+
+    python benchmark.py --save-baseline
+
+Thresholds map a request name (or ``all`` for the whole run) to any of
+``p50_ms``, ``p95_ms`` and ``p99_ms`` (the most the result may be, as a
+multiple of the baseline) and ``rps`` (the least requests per second may
+be, as a multiple of the baseline).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+import charts
+
+THRESHOLDS_FILE = 'benchmark_thresholds.json'
+BASELINE_FILE = 'benchmark_baseline.json'
+UPDATE_PATH = '/_dash-update-component'
+PATHNAME = '/dashboard'
+CHARTS_OUTPUT = '{"chart":["ALL"],"type":"chart"}.figure'
+
+
+def request_body(output, inputs, outputs=None, changed=()):
+    """Build the JSON body Dash's renderer posts for one callback.
+
+    Args:
+        output (str): The callback's output key, e.g. 'page-content.children'
+        inputs (list): (id, property, value) triples
+        outputs: The outputs' ids and properties; derived from output if
+            omitted
+        changed (list): 'id.property' strings of the inputs that changed
+    """
+    if outputs is None:
+        component_id, prop = output.split('.')
+        outputs = {'id': component_id, 'property': prop}
+    return {
+        'output': output,
+        'outputs': outputs,
+        'inputs': [{'id': i, 'property': p, 'value': v}
+                   for i, p, v in inputs],
+        'changedPropIds': list(changed),
+        'state': []
+    }
+
+
+def charts_body(values=None, changed=None):
+    """Body of the single request that renders the dashboard's charts.
+
+    Args:
+        values (dict): Dropdown values by dropdown id; defaults otherwise
+        changed (str): Dropdown id that changed, or None for a page load
+    """
+    values = values or {}
+    server_side = [spec for spec in charts.CHARTS if not spec.client_side]
+    inputs = [('url', 'pathname', PATHNAME)] + [
+        (spec.control['id'], 'value',
+         values.get(spec.control['id'], spec.control['value']))
+        for spec in server_side if spec.control is not None
+    ]
+    outputs = [
+        {'id': {'type': 'chart', 'chart': spec.key}, 'property': 'figure'}
+        for spec in server_side
+    ]
+    return request_body(CHARTS_OUTPUT, inputs, outputs,
+                        [f'{changed}.value'] if changed else [])
+
+
+def figures_body(key):
+    """Body of the request filling a client-side chart's figure store."""
+    component_id = {'type': 'chart-figures', 'chart': key}
+    output = json.dumps(component_id, sort_keys=True,
+                        separators=(',', ':')) + '.data'
+    return request_body(output, [('url', 'pathname', PATHNAME)],
+                        {'id': component_id, 'property': 'data'})
+
+
+def callback_cases():
+    """One (name, body) pair per request the dashboard makes.
+
+    The page load renders every server-side chart at once and fills each
+    client-side chart's figure store; each server-side dropdown value is
+    then a request re-rendering just that chart. Client-side charts switch
+    figures in the browser, so their dropdowns make no requests.
+    """
+    cases = [
+        ('display_page', request_body('page-content.children',
+                                      [('url', 'pathname', PATHNAME)])),
+        ('charts', charts_body()),
+    ]
+    cases += [(f'{spec.key}:figures', figures_body(spec.key))
+              for spec in charts.CHARTS if spec.client_side]
+    for spec in charts.CHARTS:
+        if spec.control is None or spec.client_side:
+            continue
+        control = spec.control['id']
+        for value in charts.control_values(spec):
+            cases.append((f'{spec.key}:{value}',
+                          charts_body({control: value}, changed=control)))
+    return cases
+
+
+class QuietHandler(WSGIRequestHandler):
+    """Request handler that skips the per-request access log line."""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def start_server(wsgi_app, host='127.0.0.1'):
+    """Serve wsgi_app on a free port from a background thread.
+
+    Returns:
+        tuple: The server (call shutdown() to stop it) and its base URL
+    """
+    server = make_server(host, 0, wsgi_app, threaded=True,
+                         request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_port}'
+
+
+def post(url, body):
+    """POST body as JSON and return the latency in seconds."""
+    data = json.dumps(body).encode()
+    request = urllib.request.Request(
+        url, data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def run_benchmark(base_url, cases, requests=200, concurrency=8, warmup=1,
+                  before_request=None):
+    """Send requests per case from concurrent clients, in shuffled order.
+
+    Args:
+        base_url (str): Server URL, e.g. 'http://127.0.0.1:8050'
+        cases (list): (name, body) pairs from callback_cases()
+        requests (int): Timed requests per case
+        concurrency (int): Number of concurrent clients
+        warmup (int): Untimed requests per case sent first
+        before_request (callable): Called before every timed request
+
+    Returns:
+        tuple: Latencies in seconds per case name, and the wall time of the
+            timed requests
+    """
+    url = base_url + UPDATE_PATH
+    for _ in range(warmup):
+        for _, body in cases:
+            post(url, body)
+
+    jobs = [case for case in cases for _ in range(requests)]
+    random.Random(0).shuffle(jobs)
+
+    def timed(case):
+        if before_request is not None:
+            before_request()
+        return case[0], post(url, case[1])
+
+    latencies = {name: [] for name, _ in cases}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name, seconds in pool.map(timed, jobs):
+            latencies[name].append(seconds)
+    return latencies, time.perf_counter() - start
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of values (q in 0-100)."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(latencies, elapsed):
+    """Latency percentiles per case plus the whole run under ``all``."""
+    def stats(values):
+        return {
+            'requests': len(values),
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+        }
+
+    report = {name: stats(values) for name, values in latencies.items()}
+    every = [v for values in latencies.values() for v in values]
+    report['all'] = dict(stats(every), rps=len(every) / elapsed)
+    return report
+
+
+def machine():
+    """Description of this machine, to tell whether a baseline applies."""
+    return {
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+    }
+
+
+def load_baseline(path, settings):
+    """The baseline report recorded on this machine with these settings.
+
+    Returns:
+        dict: The report, or None if there is no matching baseline
+    """
+    try:
+        with open(path) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    if baseline.get('machine') != machine() or \
+            baseline.get('settings') != settings:
+        return None
+    return baseline['report']
+
+
+def save_baseline(path, settings, report):
+    """Record report as the baseline for this machine and these settings."""
+    with open(path, 'w') as f:
+        json.dump({'machine': machine(), 'settings': settings,
+                   'report': report}, f, indent=2)
+
+
+def check_thresholds(report, thresholds, baseline):
+    """List every result worse than its threshold.
+
+    Args:
+        report (dict): Results from summarize()
+        thresholds (dict): Limits as multiples of the baseline's results
+        baseline (dict): Results of the baseline run, from summarize()
+
+    Returns:
+        list: Human-readable failures; empty if everything passed
+    """
+    failures = []
+    for name, limits in thresholds.items():
+        result = report.get(name)
+        if result is None:
+            failures.append(f'{name}: no results')
+            continue
+        for key, ratio in limits.items():
+            value = result.get(key)
+            reference = baseline.get(name, {}).get(key)
+            if value is None or reference is None:
+                failures.append(f'{name}: unknown metric {key}')
+                continue
+            limit = reference * ratio
+            if key == 'rps' and value < limit:
+                failures.append(f'{name}: {value:.0f} req/s below {limit:.0f} '
+                                f'({ratio}x baseline)')
+            elif key != 'rps' and value > limit:
+                failures.append(f'{name}: {key} {value:.1f} above {limit:.1f} '
+                                f'({ratio}x baseline)')
+    return failures
+
+
+def print_report(report):
+    """Print the results as a table."""
+    print(f"{'request':<22} {'requests':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8}")
+    for name, result in report.items():
+        print(f"{name:<22} {result['requests']:>8} {result['p50_ms']:>8.2f} "
+              f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f}")
+    print(f"Throughput: {report['all']['rps']:.0f} requests/sec")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--requests', type=int, default=200,
+                        help='timed requests per callback case')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='number of concurrent clients')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='untimed requests per case before timing')
+    parser.add_argument('--cold', action='store_true',
+                        help='clear the figure cache before every request')
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE,
+                        help='JSON file of limits; empty string to skip')
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help='JSON file of the baseline run the limits are '
+                             'relative to')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='record this run as the baseline')
+    parser.add_argument('--json', dest='json_path',
+                        help='also write the report to this file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    import dash_app
+    from figure_cache import figure_cache
+
+    server, base_url = start_server(dash_app.app.server)
+    try:
+        latencies, elapsed = run_benchmark(
+            base_url, callback_cases(), args.requests,
+            args.concurrency, args.warmup,
+            before_request=figure_cache.clear if args.cold else None)
+    finally:
+        server.shutdown()
+
+    report = summarize(latencies, elapsed)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if not args.thresholds:
+        return 0
+    settings = {'requests': args.requests, 'concurrency': args.concurrency,
+                'warmup': args.warmup, 'cold': args.cold}
+    if args.save_baseline:
+        save_baseline(args.baseline, settings, report)
+        print(f'Saved this run as the baseline in {args.baseline}')
+        return 0
+    baseline = load_baseline(args.baseline, settings)
+    if baseline is None:
+        print(f'NO BASELINE in {args.baseline} for this machine and these '
+              f'settings; record one with --save-baseline')
+        return 2
+    with open(args.thresholds) as f:
+        thresholds = json.load(f)
+    failures = check_thresholds(report, thresholds, baseline)
+    for failure in failures:
+        print(f'REGRESSION {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
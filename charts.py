@@ -0,0 +1,248 @@
+"""Declarative registry of the dashboard's charts.
+
+Each :class:`ChartSpec` names a chart, describes its dashboard section and
+optional dropdown, and points at the function that builds its figure from a
+:class:`dashboard_data.DashboardData`. dash_app generates the layout and one
+pattern-matching callback from :data:`CHARTS`, so adding a chart is a
+builder function and one registry entry. Client-side charts ship a figure
+for every dropdown value in one response, so switching between them costs
+no server round trip.
+"""
+import functools
+from collections import namedtuple
+
+import plotly.graph_objects as go
+
+from figure_cache import cached
+from figures import line_trace
+
+ChartSpec = namedtuple('ChartSpec', [
+    'key',          # pattern-matching id and figure cache key
+    'nav_label',    # navigation button text
+    'heading',      # section heading
+    'icon',         # Font Awesome icon class for the heading
+    'element_id',   # DOM id of the chart's container
+    'builder',      # function(data, value) -> go.Figure
+    'control',      # dcc.Dropdown arguments, or None for no dropdown
+    'client_side',  # render every dropdown value up front and switch
+                    # between them in the browser
+    'background',   # render the client-side figures in a background job
+], defaults=(False, False))
+
+# Metrics offered by the trend comparison chart
+TREND_METRIC_OPTIONS = [
+    {'label': 'Gender Gap', 'value': 'gender_gap'},
+    {'label': 'Regional Variance', 'value': 'regional_var'},
+    {'label': 'London vs National', 'value': 'london_national'}
+]
+
+# Regions offered for the breakdown charts
+REGION_OPTIONS = [
+    {'label': 'London', 'value': 'LDN'},
+    {'label': 'United Kingdom', 'value': 'UK'}
+]
+
+# Trace name, colour, title and y axis title per trend metric
+TREND_METRIC_STYLES = {
+    'gender_gap': ('Gender Gap', '#8e44ad',
+                   'Gender Gap in Unemployment Rates',
+                   'Gap (Male - Female) %'),
+    'regional_var': ('Regional Variance', '#2ecc71',
+                     'Regional Unemployment Rate Variance',
+                     'Standard Deviation'),
+    'london_national': ('London vs National', '#e67e22',
+                        'London Unemployment Rate vs National Average',
+                        'Difference from National Average (%)'),
+}
+
+
+def gender_figure(data, value=None):
+    """Male and female unemployment rates by year."""
+    fig = go.Figure()
+    fig.add_trace(line_trace(
+        data.gender['year'],
+        data.gender['male'],
+        name='Male',
+        line={'color': '#3498db'}
+    ))
+    fig.add_trace(line_trace(
+        data.gender['year'],
+        data.gender['female'],
+        name='Female',
+        line={'color': '#e74c3c'}
+    ))
+    fig.update_layout(
+        title='Gender-Based Unemployment Trends',
+        xaxis_title='Year',
+        yaxis_title='Unemployment Rate (%)',
+        template='plotly_white'
+    )
+    return fig
+
+
+def regional_figure(data, value=None):
+    """Grouped bars of every region's rate per period."""
+    fig = go.Figure()
+    regional = data.regional
+    for region in regional['RegionName'].unique():
+        region_df = regional[regional['RegionName'] == region]
+        fig.add_trace(go.Bar(
+            x=region_df['PeriodName'],
+            y=region_df['Rate'],
+            name=region
+        ))
+    fig.update_layout(
+        title='Regional Unemployment Comparison',
+        xaxis_title='Time Period',
+        yaxis_title='Unemployment Rate (%)',
+        template='plotly_white',
+        barmode='group'
+    )
+    return fig
+
+
+def london_figure(data, value=None):
+    """London's rate per period."""
+    fig = go.Figure()
+    fig.add_trace(line_trace(
+        data.london['PeriodName'],
+        data.london['Rate'],
+        name='London',
+        line={'color': '#2ecc71'}
+    ))
+    fig.update_layout(
+        title='London Unemployment Trend',
+        xaxis_title='Time Period',
+        yaxis_title='Unemployment Rate (%)',
+        template='plotly_white'
+    )
+    return fig
+
+
+def trend_figure(data, metric):
+    """The selected precomputed trend comparison metric.
+
+    A cleared dropdown (metric None) shows London vs National, as before.
+    """
+    if metric not in TREND_METRIC_STYLES:
+        metric = 'london_national'
+    name, color, title, yaxis_title = TREND_METRIC_STYLES[metric]
+    # A metric is only materialized when the database has its source rates
+    trend = data.trends.get(metric)
+    fig = go.Figure()
+    if trend is not None:
+        fig.add_trace(line_trace(
+            trend['PeriodName'],
+            trend['Value'],
+            name=name,
+            line={'color': color}
+        ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='Time Period',
+        yaxis_title=yaxis_title,
+        template='plotly_white',
+        hovermode='x unified'
+    )
+    return fig
+
+
+def breakdown_figure(dimension, title, data, region):
+    """One line per category of a breakdown dimension in the given region."""
+    # Not every dimension has rows for every region
+    breakdown = data.breakdowns.get((dimension, region))
+    fig = go.Figure()
+    if breakdown is not None:
+        for category, category_df in breakdown.groupby('Category', sort=False):
+            fig.add_trace(line_trace(
+                category_df['PeriodName'],
+                category_df['Rate'],
+                error=category_df['ConfidenceInterval'],
+                name=category
+            ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='Time Period',
+        yaxis_title='Unemployment Rate (%)',
+        template='plotly_white',
+        hovermode='x unified'
+    )
+    return fig
+
+
+CHARTS = [
+    ChartSpec('gender', 'Gender Analysis', 'Gender-Based Unemployment Trends',
+              'fas fa-venus-mars', 'gender-unemployment-chart',
+              gender_figure, None),
+    ChartSpec('regional', 'Regional Trends',
+              'Regional Unemployment Comparison', 'fas fa-map-marked-alt',
+              'regional-unemployment-chart', regional_figure, None),
+    ChartSpec('london', 'London Focus', 'London Unemployment Trend',
+              'fas fa-city', 'london-unemployment-chart', london_figure, None),
+    ChartSpec('trend', 'Trend Comparison', 'Trend Comparison',
+              'fas fa-chart-line', 'trend-comparison-chart', trend_figure,
+              {'id': 'trend-metric', 'options': TREND_METRIC_OPTIONS,
+               'value': 'gender_gap'}, client_side=True, background=True),
+    ChartSpec('disability', 'Disability', 'Unemployment by Disability',
+              'fas fa-wheelchair', 'disability-chart',
+              functools.partial(breakdown_figure, 'Disability',
+                                'Unemployment Rate by Disability'),
+              {'id': 'disability-region', 'options': REGION_OPTIONS,
+               'value': 'LDN', 'clearable': False}),
+    ChartSpec('ethnicity', 'Ethnicity', 'Unemployment by Ethnicity',
+              'fas fa-users', 'ethnicity-chart',
+              functools.partial(breakdown_figure, 'Ethnicity',
+                                'Unemployment Rate by Ethnicity'),
+              {'id': 'ethnicity-region', 'options': REGION_OPTIONS,
+               'value': 'LDN', 'clearable': False}),
+]
+
+CHARTS_BY_KEY = {spec.key: spec for spec in CHARTS}
+
+
+def control_values(spec):
+    """Every value a chart can be rendered for (None if it has no control)."""
+    if spec.control is None:
+        return [None]
+    return [option['value'] for option in spec.control['options']]
+
+
+def render(snapshot, key, value=None):
+    """Figure dict for one chart, built from the snapshot or the cache.
+
+    Args:
+        snapshot (dashboard_data.Snapshot): Data every chart is built from
+        key (str): Chart key in CHARTS_BY_KEY
+        value: The chart's dropdown value, if it has one
+
+    Returns:
+        dict: Serialized plotly figure
+    """
+    builder = CHARTS_BY_KEY[key].builder
+    return cached(('chart', key, value), snapshot.version,
+                  lambda: builder(snapshot.data, value))
+
+
+def render_variants(snapshot, key, progress=None):
+    """Figures for every dropdown value of a client-side chart.
+
+    Args:
+        snapshot (dashboard_data.Snapshot): Data every chart is built from
+        key (str): Chart key in CHARTS_BY_KEY
+        progress (callable): Called with (done, total) after each figure
+
+    Returns:
+        dict: Figure dict per value; a cleared dropdown's figure is under
+            'null', the key a JavaScript lookup with null reads
+    """
+    spec = CHARTS_BY_KEY[key]
+    values = control_values(spec)
+    if spec.control.get('clearable', True):
+        values = values + [None]
+    figures = {}
+    for done, value in enumerate(values, 1):
+        figures['null' if value is None else value] = render(
+            snapshot, key, value)
+        if progress is not None:
+            progress(done, len(values))
+    return figures
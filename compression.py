@@ -0,0 +1,80 @@
+"""Response compression for the dashboard's Flask server.
+
+Callback responses, the layout and the JavaScript bundles are compressed
+with brotli when the client accepts it and the ``brotli`` package is
+installed, and with gzip otherwise. Small and already-encoded responses are
+sent as they are.
+"""
+import gzip
+import os
+
+from flask import request
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this many bytes are not worth compressing
+MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '500'))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/css',
+                      'text/plain', 'application/javascript',
+                      'text/javascript', 'image/svg+xml')
+
+
+def accepted_encodings(header):
+    """Encodings the Accept-Encoding header allows (q > 0).
+
+    Entries with a malformed q-value are dropped by werkzeug's parser
+    rather than raising, so a bad client header cannot fail the response.
+    """
+    return {name.lower() for name, quality in parse_accept_header(header)
+            if quality > 0}
+
+
+def choose_encoding(header):
+    """The best encoding this server can produce for the given header."""
+    accepted = accepted_encodings(header or '')
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    """Compress bytes with the named encoding."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response, accept_encoding):
+    """Compress a Flask response in place if it is worth doing."""
+    response.vary.add('Accept-Encoding')
+    if (response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code >= 300
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < MIN_SIZE:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def enable_compression(server):
+    """Compress every eligible response of a Flask server."""
+    @server.after_request
+    def _compress(response):
+        return compress_response(response,
+                                 request.headers.get('Accept-Encoding'))
@@ -0,0 +1,70 @@
+import importlib
+import pytest
+
+create_db = importlib.import_module('2_create_database')
+
+GENDER_CSV = """time,male,female
+Jan 2021-Dec 2021,5.9,5.2
+Jan 2022-Dec 2022,4.6,4.2
+Jan 2023-Dec 2023,5.2,4.8
+"""
+
+REGION_CSV = """time,UK,LDN
+Jan 2021-Dec 2021,4.4,5.6
+Jan 2022-Dec 2022,3.5,4.4
+Jan 2023-Dec 2023,3.7,5.0
+"""
+
+BREAKDOWN_CSV = """time,region,dimension,category,rate,conf
+Jan 2022-Dec 2022,LDN,Disability,disabled,8.7,1.2
+Jan 2022-Dec 2022,LDN,Disability,not disabled,4.1,0.5
+Jan 2023-Dec 2023,LDN,Disability,disabled,7.0,1.1
+Jan 2023-Dec 2023,LDN,Disability,not disabled,4.6,
+Jan 2023-Dec 2023,UK,Ethnicity,White,3.2,0.1
+"""
+
+
+def build_database(directory):
+    """Build a small unemployment.db in directory with 2_create_database.py"""
+    (directory / 'q1_gender.csv').write_text(GENDER_CSV)
+    (directory / 'q2_region.csv').write_text(REGION_CSV)
+    (directory / 'q3_breakdown.csv').write_text(BREAKDOWN_CSV)
+    assert create_db.rebuild_database()
+    return str(directory / 'unemployment.db')
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Fixture building a small unemployment.db in the test's working directory"""
+    monkeypatch.chdir(tmp_path)
+    return build_database(tmp_path)
+
+
+@pytest.fixture(scope='module')
+def dashboard(tmp_path_factory):
+    """Fixture pointing the dashboard at a fixture database
+
+    Yields a Flask test client for the Dash app. The database is built once
+    per test module, and its tests must not change it. The data store,
+    connection pool and figure cache are swapped out for the module, so
+    nothing loaded from another database leaks in.
+    """
+    import dash_app
+    import dashboard_data
+    import data_access
+    from figure_cache import figure_cache
+
+    directory = tmp_path_factory.mktemp('dashboard')
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # 2_create_database.py reads its CSVs from the working directory
+        monkeypatch.chdir(directory)
+        database = build_database(directory)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(dashboard_data, 'store',
+                            dashboard_data.DataStore(interval=0))
+        data_access.configure(database)
+        figure_cache.clear()
+        yield dash_app.app.server.test_client()
+        figure_cache.clear()
+        data_access.configure()
@@ -1,55 +1,50 @@
-import pandas as pd
-import plotly.graph_objects as go
-from dash import Dash, html, dcc
+import functools
+import os
+from dash import ALL, Dash, ctx, html, dcc, no_update
 from dash.dependencies import Input, Output
-import sqlite3
+import background
+import charts
+import dashboard_data
+import data_access
+import figures
+from charts import CHARTS
+from compression import enable_compression
+from http_cache import enable_http_caching, source_fingerprint
+from metrics import instrumented, register as register_metrics
 
-# Data loading from SQLite database
-def load_data():
-    conn = sqlite3.connect('unemployment.db')
-    
-    # Load gender data
-    gender_data = pd.read_sql_query("""
-        SELECT year, male, female 
-        FROM gender_unemployment 
-        ORDER BY year
-    """, conn)
-    
-    # Load regional data
-    regional_data = pd.read_sql_query("""
-        SELECT tp.PeriodName, r.RegionName, ur.Rate
-        FROM UnemploymentRateByRegion ur
-        JOIN TimePeriod tp ON ur.PeriodID = tp.PeriodID
-        JOIN Region r ON ur.RegionID = r.RegionID
-        ORDER BY tp.PeriodID, r.RegionID
-    """, conn)
-    
-    # Load London specific data
-    london_data = pd.read_sql_query("""
-        SELECT tp.PeriodName, ur.Rate
-        FROM UnemploymentRateByRegion ur
-        JOIN TimePeriod tp ON ur.PeriodID = tp.PeriodID
-        JOIN Region r ON ur.RegionID = r.RegionID
-        WHERE r.RegionName = 'LDN'
-        ORDER BY tp.PeriodID
-    """, conn)
-    
-    conn.close()
-    return gender_data, regional_data, london_data
-
-# Load the data
-gender_data, regional_data, london_data = load_data()
+# Third-party stylesheets and page background, vendored under assets/vendor/
+# so the dashboard loads without network access
+STYLESHEETS = [
+    '/assets/vendor/bootstrap-5.1.3/bootstrap.min.css',
+    '/assets/vendor/font-awesome-5.15.4/css/all.min.css'
+]
+PAGE_BACKGROUND = '/assets/vendor/background.svg'
 
 # Initialize the Dash app
 app = Dash(
     __name__,
-    external_stylesheets=[
-        'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css',
-        'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css'
-    ],
+    external_stylesheets=STYLESHEETS,
+    # Vendored stylesheets are linked above so they load before ours
+    assets_path_ignore=['vendor'],
     suppress_callback_exceptions=True
 )
 
+# Prometheus-format callback latency metrics at /metrics
+register_metrics(app.server)
+
+# gzip/brotli for callback responses and page assets
+enable_compression(app.server)
+
+# ETags from the data version (304s skip the callback) and asset caching
+enable_http_caching(
+    app.server,
+    version=lambda: dashboard_data.store.get().version,
+    salt=os.environ.get('APP_VERSION') or source_fingerprint(
+        __file__, charts.__file__, figures.__file__),
+    last_modified=lambda: data_access.modified_time(
+        dashboard_data.store.get().version)
+)
+
 # Create home page layout
 home_layout = html.Div([
     html.Div([
@@ -68,70 +63,81 @@ home_layout = html.Div([
     ], className='container')
 ])
 
+def chart_id(key):
+    """Pattern-matching id of a chart's graph"""
+    return {'type': 'chart', 'chart': key}
+
+
+def client_chart_id(key):
+    """Pattern-matching id of a client-side chart's graph"""
+    return {'type': 'client-chart', 'chart': key}
+
+
+def progress_id(key):
+    """Pattern-matching id of a background chart's progress bar"""
+    return {'type': 'chart-progress', 'chart': key}
+
+
+def figures_id(key):
+    """Pattern-matching id of the store holding a client-side chart's figures"""
+    return {'type': 'chart-figures', 'chart': key}
+
+
+def nav_id(key):
+    """Pattern-matching id of a chart's navigation button"""
+    return {'type': 'nav', 'chart': key}
+
+
+def chart_section(spec):
+    """
+    Build the dashboard section for one registered chart.
+    
+    Args:
+        spec (charts.ChartSpec): Chart to lay out
+    
+    Returns:
+        html.Div: Heading, graph and optional dropdown
+    """
+    graph_id = (client_chart_id(spec.key) if spec.client_side
+                else chart_id(spec.key))
+    children = [
+        html.H2([html.I(className=spec.icon), ' ' + spec.heading]),
+        # The container keeps the chart's original DOM id
+        dcc.Loading(
+            dcc.Graph(id=graph_id),
+            id=spec.element_id
+        )
+    ]
+    if spec.control is not None:
+        children.append(dcc.Dropdown(
+            style={'width': '50%', 'margin': '20px auto'},
+            **spec.control
+        ))
+    if spec.client_side:
+        children.append(dcc.Store(id=figures_id(spec.key)))
+    if spec.background:
+        children.append(html.Progress(id=progress_id(spec.key),
+                                      style={'display': 'none'}))
+    return html.Div(children, className='dashboard-section',
+                    id=f'{spec.key}-section')
+
+
 dashboard_layout = html.Div([
     html.Div([
         html.H1('Unemployment Insight Hub'),
         html.Div([
-            html.Button('Gender Analysis',
-                     id='nav-gender',
-                     className='nav-link'),
-            html.Button('Regional Trends',
-                     id='nav-regional',
-                     className='nav-link'),
-            html.Button('London Focus',
-                     id='nav-london',
-                     className='nav-link'),
-            html.Button('Trend Comparison',
-                     id='nav-trend',
-                     className='nav-link'),
+            html.Button(spec.nav_label,
+                     id=nav_id(spec.key),
+                     className='nav-link')
+            for spec in CHARTS
+        ] + [
             dcc.Link([html.I(className='fas fa-home'), ' Back to Home'],
                     href='/',
                     className='back-button')
         ], className='nav-menu',
+           id='nav-menu',
            style={'position': 'sticky', 'top': '0', 'zIndex': '1000'}),
-        html.Div([
-            html.H2([html.I(className='fas fa-venus-mars'),
-                    ' Gender-Based Unemployment Trends']),
-            dcc.Loading(
-                dcc.Graph(id='gender-unemployment-chart')
-            )
-        ], className='dashboard-section',
-           id='gender-section'),
-        html.Div([
-            html.H2([html.I(className='fas fa-map-marked-alt'),
-                    ' Regional Unemployment Comparison']),
-            dcc.Loading(
-                dcc.Graph(id='regional-unemployment-chart')
-            )
-        ], className='dashboard-section',
-           id='regional-section'),
-        html.Div([
-            html.H2([html.I(className='fas fa-city'),
-                    ' London Unemployment Trend']),
-            dcc.Loading(
-                dcc.Graph(id='london-unemployment-chart')
-            )
-        ], className='dashboard-section',
-           id='london-section'),
-        html.Div([
-            html.H2([html.I(className='fas fa-chart-line'),
-                    ' Trend Comparison']),
-            dcc.Loading(
-                dcc.Graph(id='trend-comparison-chart')
-            ),
-            dcc.Dropdown(
-                id='trend-metric',
-                options=[
-                    {'label': 'Gender Gap', 'value': 'gender_gap'},
-                    {'label': 'Regional Variance', 'value': 'regional_var'},
-                    {'label': 'London vs National', 'value': 'london_national'}
-                ],
-                value='gender_gap',
-                style={'width': '50%', 'margin': '20px auto'}
-            )
-        ], className='dashboard-section',
-           id='trend-section')
-    ], className='container')
+    ] + [chart_section(spec) for spec in CHARTS], className='container')
 ])
 
 # Main layout
@@ -145,6 +151,7 @@ app.layout = html.Div([
     Output('page-content', 'children'),
     [Input('url', 'pathname')]
 )
+@instrumented('display_page')
 def display_page(pathname):
     """
     Route to appropriate page based on URL pathname.
@@ -159,273 +166,129 @@ def display_page(pathname):
         return dashboard_layout
     return home_layout
 
-# Separate callbacks for each chart
-@app.callback(
-    Output('gender-unemployment-chart', 'figure'),
-    [Input('url', 'pathname')]
-)
-def update_gender_chart(pathname):
-    """
-    Update the gender unemployment chart.
-    
-    Args:
-        pathname (str): Current URL pathname
-    
-    Returns:
-        dict: Plotly figure object
-    """
-    if pathname != '/dashboard':
-        return {}
-    conn = sqlite3.connect('unemployment.db')
-    fresh_gender_data = pd.read_sql_query("""
-        SELECT year, male, female
-        FROM gender_unemployment
-        ORDER BY year""", conn)
-    conn.close()
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=fresh_gender_data['year'],
-        y=fresh_gender_data['male'],
-        name='Male',
-        line={'color': '#3498db'}
-    ))
-    fig.add_trace(go.Scatter(
-        x=fresh_gender_data['year'],
-        y=fresh_gender_data['female'],
-        name='Female',
-        line={'color': '#e74c3c'}
-    ))
-    fig.update_layout(
-        title='Gender-Based Unemployment Trends',
-        xaxis_title='Year',
-        yaxis_title='Unemployment Rate (%)',
-        template='plotly_white'
-    )
-    return fig
+# Server-rendered charts with a dropdown, in the order their values reach
+# update_charts
+CONTROLLED_CHARTS = [spec for spec in CHARTS
+                     if spec.control is not None and not spec.client_side]
+CLIENT_SIDE_CHARTS = [spec for spec in CHARTS if spec.client_side]
 
-@app.callback(
-    Output('regional-unemployment-chart', 'figure'),
-    [Input('url', 'pathname')]
-)
-def update_regional_chart(pathname):
+
+def render_charts(keys, values, only=None):
     """
-    Update the regional unemployment comparison chart.
+    Render the requested charts from one shared data snapshot.
     
     Args:
-        pathname (str): Current URL pathname
+        keys (list): Chart keys, in output order
+        values (dict): Dropdown value per chart key
+        only (str): If set, every other chart is left unchanged
     
     Returns:
-        dict: Plotly figure object
+        list: Figure dicts, or no_update for charts left unchanged
     """
-    if pathname != '/dashboard':
-        return {}
-    conn = sqlite3.connect('unemployment.db')
-    fresh_regional_data = pd.read_sql_query("""
-        SELECT tp.PeriodName, r.RegionName, ur.Rate
-        FROM UnemploymentRateByRegion ur
-        JOIN TimePeriod tp ON ur.PeriodID = tp.PeriodID
-        JOIN Region r ON ur.RegionID = r.RegionID
-        ORDER BY tp.PeriodID, r.RegionID""", conn)
-    conn.close()
-    fig = go.Figure()
-    for region in fresh_regional_data['RegionName'].unique():
-        region_df = fresh_regional_data[fresh_regional_data['RegionName'] == region]
-        fig.add_trace(go.Bar(
-            x=region_df['PeriodName'],
-            y=region_df['Rate'],
-            name=region
-        ))
-    fig.update_layout(
-        title='Regional Unemployment Comparison',
-        xaxis_title='Time Period',
-        yaxis_title='Unemployment Rate (%)',
-        template='plotly_white',
-        barmode='group'
-    )
-    return fig
+    snapshot = dashboard_data.store.get()
+    return [
+        charts.render(snapshot, key, values.get(key))
+        if only is None or key == only else no_update
+        for key in keys
+    ]
 
+
+# One callback serves every server-rendered chart in a single request
 @app.callback(
-    Output('london-unemployment-chart', 'figure'),
-    [Input('url', 'pathname')]
+    Output(chart_id(ALL), 'figure'),
+    [Input('url', 'pathname')] +
+    [Input(spec.control['id'], 'value') for spec in CONTROLLED_CHARTS]
 )
-def update_london_chart(pathname):
+@instrumented('charts')
+def update_charts(pathname, *control_values):
     """
-    Update the London unemployment trend chart.
+    Update every server-rendered chart on the dashboard.
+    
+    When a dropdown changed, only its chart is re-rendered.
     
     Args:
         pathname (str): Current URL pathname
+        *control_values: Current value of each chart's dropdown
     
     Returns:
-        dict: Plotly figure object
+        list: Figure dicts, or no_update for charts left unchanged
     """
+    keys = [output['id']['chart'] for output in ctx.outputs_list]
     if pathname != '/dashboard':
-        return {}
-    conn = sqlite3.connect('unemployment.db')
-    fresh_london_data = pd.read_sql_query("""
-        SELECT tp.PeriodName, ur.Rate
-        FROM UnemploymentRateByRegion ur
-        JOIN TimePeriod tp ON ur.PeriodID = tp.PeriodID
-        JOIN Region r ON ur.RegionID = r.RegionID
-        WHERE r.RegionName = 'LDN'
-        ORDER BY tp.PeriodID""", conn)
-    conn.close()
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=fresh_london_data['PeriodName'],
-        y=fresh_london_data['Rate'],
-        name='London',
-        line={'color': '#2ecc71'}
-    ))
-    fig.update_layout(
-        title='London Unemployment Trend',
-        xaxis_title='Time Period',
-        yaxis_title='Unemployment Rate (%)',
-        template='plotly_white'
-    )
-    return fig
+        return [{} for _ in keys]
+    values = {spec.key: value
+              for spec, value in zip(CONTROLLED_CHARTS, control_values)}
+    changed = {spec.control['id']: spec.key for spec in CONTROLLED_CHARTS}
+    return render_charts(keys, values, only=changed.get(ctx.triggered_id))
 
-@app.callback(
-    Output('trend-comparison-chart', 'figure'),
-    [Input('url', 'pathname'),
-     Input('trend-metric', 'value')]
-)
-def update_trend_comparison(pathname, metric):
+
+def figures_callback(spec):
     """
-    Update the trend comparison chart based on selected metric.
+    Build the callback filling a client-side chart's figure store.
     
     Args:
-        pathname (str): Current URL pathname
-        metric (str): Selected comparison metric
+        spec (charts.ChartSpec): Client-side chart
     
     Returns:
-        dict: Plotly figure object
+        function: Callback taking a set_progress function and the pathname
     """
-    if pathname != '/dashboard':
-        return {}
-    conn = sqlite3.connect('unemployment.db')
-    fig = go.Figure()
-    if metric == 'gender_gap':
-        fresh_gender_data = pd.read_sql_query("""
-            SELECT year, male, female
-            FROM gender_unemployment
-            ORDER BY year""", conn)
-        gender_gap = fresh_gender_data['male'] - fresh_gender_data['female']
-        fig.add_trace(go.Scatter(
-            x=fresh_gender_data['year'],
-            y=gender_gap,
-            name='Gender Gap',
-            line={'color': '#8e44ad'}
-        ))
-        title = 'Gender Gap in Unemployment Rates'
-        yaxis_title = 'Gap (Male - Female) %'
-    elif metric == 'regional_var':
-        fresh_regional_data = pd.read_sql_query("""
-            SELECT tp.PeriodName, ur.Rate
-            FROM UnemploymentRateByRegion ur
-            JOIN TimePeriod tp ON ur.PeriodID = tp.PeriodID
-            JOIN Region r ON ur.RegionID = r.RegionID
-            ORDER BY tp.PeriodID""", conn)
-        regional_stats = fresh_regional_data.groupby('PeriodName')['Rate'].agg(['mean', 'std'])
-        fig.add_trace(go.Scatter(
-            x=regional_stats.index,
-            y=regional_stats['std'],
-            name='Regional Variance',
-            line={'color': '#2ecc71'}
-        ))
-        title = 'Regional Unemployment Rate Variance'
-        yaxis_title = 'Standard Deviation'
-    else:  # london_national
-        national_data = pd.read_sql_query("""
-            SELECT tp.PeriodName, AVG(ur.Rate) as NationalAvg
-            FROM UnemploymentRateByRegion ur
-            JOIN TimePeriod tp ON ur.PeriodID = tp.PeriodID
-            GROUP BY tp.PeriodID, tp.PeriodName
-            ORDER BY tp.PeriodID""", conn)
-        fresh_london_data = pd.read_sql_query("""
-            SELECT tp.PeriodName, ur.Rate
-            FROM UnemploymentRateByRegion ur
-            JOIN TimePeriod tp ON ur.PeriodID = tp.PeriodID
-            JOIN Region r ON ur.RegionID = r.RegionID
-            WHERE r.RegionName = 'LDN'
-            ORDER BY tp.PeriodID""", conn)
-        london_vs_national = pd.merge(
-            fresh_london_data,
-            national_data,
-            on='PeriodName'
-        )
-        difference = london_vs_national['Rate'] - london_vs_national['NationalAvg']
-        fig.add_trace(go.Scatter(
-            x=london_vs_national['PeriodName'],
-            y=difference,
-            name='London vs National',
-            line={'color': '#e67e22'}
-        ))
-        title = 'London Unemployment Rate vs National Average'
-        yaxis_title = 'Difference from National Average (%)'
-    conn.close()
-    fig.update_layout(
-        title=title,
-        xaxis_title='Time Period',
-        yaxis_title=yaxis_title,
-        template='plotly_white',
-        hovermode='x unified'
-    )
-    return fig
+    @instrumented(f'{spec.key}_figures')
+    def update_figures(set_progress, pathname):
+        if pathname != '/dashboard':
+            return None
+        return charts.render_variants(
+            dashboard_data.store.get(), spec.key,
+            progress=lambda done, total: set_progress((done, total)))
+    return update_figures
 
-# Add this clientside callback at the end of your file
-app.clientside_callback(
-    """
-    function(n_clicks) {
-        if (n_clicks) {
-            const section = document.getElementById('gender-section');
-            if (section) {
-                section.scrollIntoView({behavior: 'smooth', block: 'start'});
-            }
-        }
-        return window.dash_clientside.no_update;
-    }
-    """,
-    Output('gender-section', 'style'),
-    Input('nav-gender', 'n_clicks'),
-)
 
-app.clientside_callback(
-    """
-    function(n_clicks) {
-        if (n_clicks) {
-            const section = document.getElementById('regional-section');
-            if (section) {
-                section.scrollIntoView({behavior: 'smooth', block: 'start'});
-            }
-        }
-        return window.dash_clientside.no_update;
-    }
-    """,
-    Output('regional-section', 'style'),
-    Input('nav-regional', 'n_clicks'),
-)
+# Job manager for charts marked background; None when diskcache and
+# multiprocess are not installed, and their callbacks run in the request
+BACKGROUND_MANAGER = background.make_manager()
 
-app.clientside_callback(
-    """
-    function(n_clicks) {
-        if (n_clicks) {
-            const section = document.getElementById('london-section');
-            if (section) {
-                section.scrollIntoView({behavior: 'smooth', block: 'start'});
+for spec in CLIENT_SIDE_CHARTS:
+    if spec.background and BACKGROUND_MANAGER is not None:
+        app.callback(
+            Output(figures_id(spec.key), 'data'),
+            Input('url', 'pathname'),
+            background=True,
+            manager=BACKGROUND_MANAGER,
+            progress=[Output(progress_id(spec.key), 'value'),
+                      Output(progress_id(spec.key), 'max')],
+            running=[(Output(progress_id(spec.key), 'style'),
+                      {'display': 'block', 'width': '50%',
+                       'margin': '0 auto'},
+                      {'display': 'none'})]
+        )(figures_callback(spec))
+    else:
+        app.callback(
+            Output(figures_id(spec.key), 'data'),
+            Input('url', 'pathname')
+        )(functools.partial(figures_callback(spec), lambda progress: None))
+
+# Switch a client-side chart's figure in the browser when its dropdown changes
+for spec in CLIENT_SIDE_CHARTS:
+    app.clientside_callback(
+        """
+        function(value, figures) {
+            if (!figures || figures[value] === undefined) {
+                return window.dash_clientside.no_update;
             }
+            return figures[value];
         }
-        return window.dash_clientside.no_update;
-    }
-    """,
-    Output('london-section', 'style'),
-    Input('nav-london', 'n_clicks'),
-)
+        """,
+        Output(client_chart_id(spec.key), 'figure'),
+        Input(spec.control['id'], 'value'),
+        Input(figures_id(spec.key), 'data')
+    )
 
+# Scroll to a chart's section when its navigation button is clicked
 app.clientside_callback(
     """
     function(n_clicks) {
-        if (n_clicks) {
-            const section = document.getElementById('trend-section');
+        const triggered = window.dash_clientside.callback_context.triggered_id;
+        if (triggered) {
+            const section = document.getElementById(triggered.chart + '-section');
             if (section) {
                 section.scrollIntoView({behavior: 'smooth', block: 'start'});
             }
@@ -433,8 +296,9 @@ app.clientside_callback(
         return window.dash_clientside.no_update;
     }
     """,
-    Output('trend-section', 'style'),
-    Input('nav-trend', 'n_clicks'),
+    Output('nav-menu', 'data-scrolled'),
+    Input(nav_id(ALL), 'n_clicks'),
+    prevent_initial_call=True
 )
 
 # Update the app styling
@@ -447,72 +311,8 @@ app.index_string = '''
         {%favicon%}
         {%css%}
         <style>
-            html {
-                scroll-behavior: smooth;
-                scroll-padding-top: 100px;
-            }
-            body {
-                margin: 0;
-                padding: 0;
-                background: linear-gradient(rgba(0, 0, 0, 0.7), rgba(0, 0, 0, 0.7)),
-                            url('https://images.unsplash.com/photo-1486406146926-c627a92ad1ab?ixlib=rb-1.2.1&auto=format&fit=crop&w=1950&q=80');
-                background-size: cover;
-                background-position: center;
-                background-attachment: fixed;
-            }
-            .container {
-                background: rgba(255, 255, 255, 0.95);
-                border-radius: 15px;
-                padding: 20px;
-                margin: 20px auto;
-            }
-            .nav-menu {
-                background: #2c3e50;
-                padding: 15px;
-                border-radius: 10px;
-                margin-bottom: 30px;
-                display: flex;
-                justify-content: space-around;
-                align-items: center;
-            }
-            .nav-link {
-                color: white !important;
-                text-decoration: none;
-                padding: 8px 15px;
-                margin: 0 10px;
-                border-radius: 5px;
-                transition: background 0.3s;
-                cursor: pointer;
-            }
-            .nav-link:hover {
-                background: #34495e;
-            }
-            .back-button {
-                color: white !important;
-                background: #c0392b;
-                padding: 8px 15px;
-                border-radius: 5px;
-                text-decoration: none;
-                transition: background 0.3s;
-            }
-            .back-button:hover {
-                background: #e74c3c;
-            }
-            .dashboard-section {
-                margin-bottom: 40px;
-            }
-            .dashboard-button {
-                background: #2c3e50;
-                color: white !important;
-                padding: 15px 30px;
-                border-radius: 8px;
-                text-decoration: none;
-                font-size: 20px;
-                transition: background 0.3s;
-                text-align: center;
-            }
-            .dashboard-button:hover {
-                background: #34495e;
+            :root {
+                --page-background: url('__PAGE_BACKGROUND__');
             }
         </style>
     </head>
@@ -525,7 +325,9 @@ app.index_string = '''
         </footer>
     </body>
 </html>
-'''
+'''.replace('__PAGE_BACKGROUND__', PAGE_BACKGROUND)
 
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    # Development server only; see wsgi.py for production serving
+    data_access.check_schema()
+    app.run(debug=os.environ.get('DASH_DEBUG', '1') == '1')
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""Server-side store of the frames behind the dashboard charts.
+
+Every frame the dashboard charts is loaded into memory once per database
+version by a :class:`DataStore`. Callbacks read the current snapshot without
+taking a lock or touching SQLite; a background thread polls the database
+version and swaps in a freshly loaded snapshot when the file is rebuilt.
+"""
+import logging
+import os
+import threading
+from collections import namedtuple
+
+import data_access
+import metrics
+from fork_hooks import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the database version; 0 disables the poller
+REFRESH_INTERVAL = float(os.environ.get('DASHBOARD_REFRESH_INTERVAL', '5'))
+
+DashboardData = namedtuple('DashboardData', [
+    'gender',             # year, male, female
+    'regional',           # PeriodName, RegionName, Rate
+    'london',             # PeriodName, Rate
+    'trends',             # metric -> PeriodName, Value
+    'breakdowns',         # (dimension, region) -> Category, PeriodName,
+                          #                        Rate, ConfidenceInterval
+])
+
+Snapshot = namedtuple('Snapshot', ['version', 'data'])
+
+
+def split_trends(frame):
+    """Split the trend metrics frame into one series per metric.
+
+    Args:
+        frame (pd.DataFrame): Result of data_access.fetch_trend_metrics()
+
+    Returns:
+        dict: Metric name to a frame of PeriodName, Value
+    """
+    return {
+        metric: rows[['PeriodName', 'Value']].reset_index(drop=True)
+        for metric, rows in frame.groupby('Metric', sort=False)
+    }
+
+
+def split_breakdowns(frame):
+    """Split the breakdown frame into one chart's rows per dimension and region.
+
+    Args:
+        frame (pd.DataFrame): Result of data_access.fetch_breakdowns()
+
+    Returns:
+        dict: (dimension, region) to a frame of Category, PeriodName, Rate,
+            ConfidenceInterval
+    """
+    columns = ['Category', 'PeriodName', 'Rate', 'ConfidenceInterval']
+    return {
+        key: rows[columns].reset_index(drop=True)
+        for key, rows in frame.groupby(['Dimension', 'RegionName'], sort=False)
+    }
+
+
+def derive_series(frame, gender_frame, trend_frame=None, breakdown_frame=None):
+    """Split the dashboard frames into the series each chart needs.
+
+    Args:
+        frame (pd.DataFrame): Result of data_access.fetch_dashboard_frame()
+        gender_frame (pd.DataFrame): Result of data_access.fetch_gender_rates()
+        trend_frame (pd.DataFrame): Result of data_access.fetch_trend_metrics()
+        breakdown_frame (pd.DataFrame): Result of data_access.fetch_breakdowns()
+
+    Returns:
+        DashboardData: Frames for every chart
+    """
+    regional = frame[['PeriodName', 'RegionName', 'Rate']].reset_index(
+        drop=True)
+    london = regional[regional['RegionName'] == 'LDN'][
+        ['PeriodName', 'Rate']].reset_index(drop=True)
+
+    return DashboardData(
+        gender=gender_frame[['year', 'male', 'female']].reset_index(drop=True),
+        regional=regional,
+        london=london,
+        trends={} if trend_frame is None else split_trends(trend_frame),
+        breakdowns=({} if breakdown_frame is None
+                    else split_breakdowns(breakdown_frame))
+    )
+
+
+def load_dashboard_data():
+    """Read every chart's rows into a DashboardData.
+
+    The rows come from the builder's memory-mapped snapshot when it matches
+    the database, and from SQLite otherwise.
+    """
+    # Imports pandas and numpy, so it is deferred until the first load
+    import snapshot_file
+
+    with metrics.phase('snapshot'):
+        snapshot = snapshot_file.read_snapshot()
+    if snapshot is not None:
+        frames = (snapshot['dashboard'], snapshot['gender'],
+                  snapshot['trend_metrics'], snapshot['breakdowns'])
+    else:
+        frames = (data_access.fetch_dashboard_frame(),
+                  data_access.fetch_gender_rates(),
+                  data_access.fetch_trend_metrics(),
+                  data_access.fetch_breakdowns())
+    with metrics.phase('transform'):
+        return derive_series(*frames)
+
+
+class DataStore:
+    """In-memory snapshot of the dashboard data, refreshed in the background.
+
+    Readers get the current :class:`Snapshot` with a single attribute read,
+    so callbacks never wait on a lock or a query. Refreshes build a complete
+    new snapshot and then swap the reference, so a reader sees either the
+    old data or the new data, never a mix. If a refresh fails the previous
+    snapshot keeps being served.
+    """
+
+    def __init__(self, loader=None, version=None, interval=REFRESH_INTERVAL):
+        self.loader = loader or load_dashboard_data
+        self.version = version or (lambda: data_access.database_version())
+        self.interval = interval
+        self._snapshot = None
+        self._init_locks()
+
+    def _init_locks(self):
+        self._load_lock = threading.Lock()
+        self._poller = None
+        self._poller_pid = None
+        self._stopped = threading.Event()
+
+    def get(self):
+        """Return the current snapshot, loading it on first use."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        self._ensure_poller()
+        return snapshot
+
+    def refresh(self, force=False):
+        """Reload the data if the database version changed.
+
+        Args:
+            force (bool): Reload even if the version is unchanged
+
+        Returns:
+            Snapshot: The snapshot now being served
+        """
+        with self._load_lock:
+            version = self.version()
+            current = self._snapshot
+            if force or current is None or current.version != version:
+                with metrics.traced('data_load'):
+                    data = self.loader()
+                self._snapshot = Snapshot(version, data)
+            return self._snapshot
+
+    def _poll(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception('Dashboard data refresh failed; '
+                                 'serving the previous snapshot')
+
+    def _ensure_poller(self):
+        # Threads do not survive fork(), so each worker process starts its own
+        if self.interval <= 0 or self._poller_pid == os.getpid():
+            return
+        with self._load_lock:
+            if self._poller_pid == os.getpid():
+                return
+            self._poller = threading.Thread(
+                target=self._poll, name='dashboard-data-refresh', daemon=True)
+            self._poller_pid = os.getpid()
+            self._poller.start()
+
+    def stop(self):
+        """Stop the background refresh thread."""
+        self._stopped.set()
+
+    def _after_fork(self):
+        self._init_locks()
+
+
+store = DataStore()
+register_after_fork(store._after_fork)
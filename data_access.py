@@ -0,0 +1,294 @@
+"""Read-only data access layer for the dashboard.
+
+Every dashboard read goes through a small, thread-safe pool of read-only
+SQLite connections instead of opening a fresh connection per callback.
+"""
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+import metrics
+
+DB_PATH = os.environ.get('UNEMPLOYMENT_DB', 'unemployment.db')
+POOL_SIZE = int(os.environ.get('UNEMPLOYMENT_DB_POOL_SIZE', '4'))
+MMAP_SIZE = 64 * 1024 * 1024     # bytes
+CACHE_SIZE_KB = 8 * 1024         # page cache per connection
+STATEMENT_CACHE_SIZE = 64        # prepared statements kept per connection
+ACQUIRE_TIMEOUT = 10             # seconds
+
+# Query text is kept constant so sqlite3's per-connection statement cache
+# can reuse the prepared statement on every call.
+#
+# Regional rates for every period, read straight from the table clustered
+# on its (PeriodID, RegionID) primary key, so no rows are looked up or sorted.
+DASHBOARD_QUERY = """
+    SELECT tp.PeriodName, r.RegionName, ur.Rate
+    FROM UnemploymentRateByRegion ur
+    JOIN TimePeriod tp ON ur.PeriodID = tp.PeriodID
+    JOIN Region r ON ur.RegionID = r.RegionID
+    ORDER BY ur.PeriodID, ur.RegionID"""
+
+# Male and female rates per period from the GenderRate pivot view over
+# UnemploymentRateByGender, one indexed scan in PeriodID order.
+GENDER_QUERY = """
+    SELECT Year AS year, Male AS male, Female AS female
+    FROM GenderRate
+    ORDER BY PeriodID"""
+
+# Trend comparison series are materialized by 2_create_database.py; all
+# metrics are read in one pass in (Metric, PeriodID) primary key order.
+TREND_METRICS_QUERY = """
+    SELECT tm.Metric, tp.PeriodName, tm.Value
+    FROM TrendMetrics tm
+    JOIN TimePeriod tp ON tm.PeriodID = tp.PeriodID
+    ORDER BY tm.Metric, tm.PeriodID"""
+
+# Rates for every category of every breakdown dimension (e.g. 'Disability')
+# and region, read in the table's primary key order.
+BREAKDOWNS_QUERY = """
+    SELECT b.Dimension, r.RegionName, b.Category, tp.PeriodName,
+           ub.Rate, ub.ConfidenceInterval
+    FROM UnemploymentRateByBreakdown ub
+    JOIN Breakdown b ON ub.BreakdownID = b.BreakdownID
+    JOIN Region r ON ub.RegionID = r.RegionID
+    JOIN TimePeriod tp ON ub.PeriodID = tp.PeriodID
+    ORDER BY ub.BreakdownID, ub.RegionID, ub.PeriodID"""
+
+
+# Every statement the dashboard runs, checked against the schema at startup
+QUERIES = {
+    'dashboard': DASHBOARD_QUERY,
+    'gender': GENDER_QUERY,
+    'trend_metrics': TREND_METRICS_QUERY,
+    'breakdowns': BREAKDOWNS_QUERY,
+}
+
+
+class SchemaError(RuntimeError):
+    """The database is missing or lacks tables the dashboard reads."""
+
+
+DatabaseVersion = namedtuple('DatabaseVersion', [
+    'inode',     # changes when the file is deleted and rebuilt
+    'mtime_ns',  # changes when it is updated in place
+    'size',
+])
+
+
+def database_version(db_path=None):
+    """Return a token that changes whenever the database file is rewritten.
+
+    The token combines inode, modification time and size, so it changes both
+    when the file is updated in place and when it is deleted and rebuilt.
+    Returns None if the database does not exist.
+    """
+    try:
+        stat = os.stat(db_path or get_pool().db_path)
+    except FileNotFoundError:
+        return None
+    return DatabaseVersion(stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def modified_time(version):
+    """Unix time the database of a database_version() token was written.
+
+    Returns None for a missing database, or a version from another source.
+    """
+    if not isinstance(version, DatabaseVersion):
+        return None
+    return version.mtime_ns / 1e9
+
+
+class ConnectionPool:
+    """Thread-safe pool of read-only SQLite connections.
+
+    Connections are opened lazily in URI ``mode=ro`` so readers never take
+    write locks and never block a WAL-mode writer, and each connection is
+    tuned with mmap and page-cache pragmas when it is created. When the
+    database file is rebuilt, connections to the old file are retired.
+    """
+
+    def __init__(self, db_path=DB_PATH, size=POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._inode = None
+        self._owners = {}
+
+    def _connect(self):
+        uri = f'file:{os.path.abspath(self.db_path)}?mode=ro'
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+        conn.execute(f'PRAGMA cache_size = -{CACHE_SIZE_KB}')
+        conn.execute('PRAGMA query_only = ON')
+        return conn
+
+    def _check_file(self):
+        """Retire idle connections if the database file has been replaced."""
+        try:
+            inode = os.stat(self.db_path).st_ino
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if inode == self._inode:
+                return
+            self._inode = inode
+            stale, self._idle = self._idle, []
+            for conn in stale:
+                self._owners.pop(conn, None)
+        for conn in stale:
+            conn.close()
+
+    def acquire(self):
+        """Check a connection out of the pool, opening one if none is idle."""
+        if not self._slots.acquire(timeout=ACQUIRE_TIMEOUT):
+            raise TimeoutError('Timed out waiting for a database connection')
+        self._check_file()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            inode = self._inode
+        try:
+            conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._owners[conn] = inode
+        return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, or close it if it is unusable."""
+        with self._lock:
+            if not discard and self._owners.get(conn) == self._inode:
+                self._idle.append(conn)
+                conn = None
+            else:
+                self._owners.pop(conn, None)
+        if conn is not None:
+            conn.close()
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection for the duration of a ``with`` block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        except sqlite3.DatabaseError:
+            self.release(conn, discard=True)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def close_all(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            for conn in idle:
+                self._owners.pop(conn, None)
+        for conn in idle:
+            conn.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # SQLite connections must not be used across fork(), so a forked worker
+    # starts with an empty pool and opens its own connections
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def configure(db_path=DB_PATH, size=POOL_SIZE):
+    """Point the data access layer at a different database file."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = ConnectionPool(db_path, size)
+    return _pool
+
+
+def read_sql(query, params=()):
+    """Run a read-only query on a pooled connection and return a DataFrame."""
+    # pandas is imported on first use so importing the app stays fast
+    import pandas as pd
+
+    with get_pool().connection() as conn, metrics.timed_query(query):
+        return pd.read_sql_query(query, conn, params=params)
+
+
+def check_schema():
+    """Fail fast if any dashboard query cannot run against the database.
+
+    Each query is compiled, not run, so the check is cheap. Call it once at
+    startup rather than letting every callback hit the same error.
+
+    Raises:
+        SchemaError: Naming the database and every query that failed
+    """
+    db_path = get_pool().db_path
+    if not os.path.exists(db_path):
+        raise SchemaError(f'{db_path} does not exist; '
+                          'build it with 2_create_database.py')
+    problems = []
+    with get_pool().connection() as conn:
+        for name, query in QUERIES.items():
+            try:
+                conn.execute('EXPLAIN ' + query)
+            except sqlite3.DatabaseError as e:
+                problems.append(f'{name}: {e}')
+    if problems:
+        raise SchemaError(f'{db_path} does not match the dashboard schema '
+                          '(rebuild it with 2_create_database.py): '
+                          + '; '.join(problems))
+
+
+def fetch_dashboard_frame():
+    """Regional rates for every period."""
+    return read_sql(DASHBOARD_QUERY)
+
+
+def fetch_gender_rates():
+    """Male and female rates per period, one row per period."""
+    return read_sql(GENDER_QUERY)
+
+
+def fetch_trend_metrics():
+    """Every precomputed trend comparison series."""
+    return read_sql(TREND_METRICS_QUERY)
+
+
+def fetch_breakdowns():
+    """Rates and confidence intervals for every breakdown category."""
+    return read_sql(BREAKDOWNS_QUERY)
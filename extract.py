@@ -0,0 +1,219 @@
+"""Single-pass extraction of the unemployment workbook.
+
+The workbook is opened once and every sheet is parsed once. Each sheet holds
+several stacked blocks (United Kingdom, then London) separated by a blank
+row; the blocks are split in memory rather than re-reading the sheet with
+different skiprows. The parsed cells are cached in an Arrow IPC (Feather)
+file keyed by the workbook's content hash, so later runs skip openpyxl.
+"""
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+WORKBOOK = 'annual-unemployment-region.xlsx'
+SHEETS = ('Gender', 'Disability', 'Ethnicity')
+BREAKDOWN_SHEETS = ('Disability', 'Ethnicity')
+
+# Block titles in the workbook and the region codes used in the database
+REGION_CODES = {'United Kingdom': 'UK', 'London': 'LDN'}
+CACHE_DIR = '.extract_cache'
+
+# Cell kinds in the cached long format
+NUMBER, INTEGER, TEXT = 0, 1, 2
+
+
+def workbook_hash(path):
+    """SHA-256 of the workbook's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_sheet_grids(path, sheets=SHEETS):
+    """Parse each sheet once into a raw grid of cell values"""
+    return pd.read_excel(path, sheet_name=list(sheets), header=None)
+
+
+def grids_to_cells(grids):
+    """Flatten raw sheet grids into one typed long-format frame
+
+    Only non-empty cells are kept. Numbers and text live in separate typed
+    columns so the frame can be stored in a columnar format.
+    """
+    parts = []
+    for sheet, grid in grids.items():
+        values = grid.to_numpy(dtype=object)
+        rows, cols = np.nonzero(grid.notna().to_numpy())
+        cells = values[rows, cols]
+        kind = np.array([
+            TEXT if isinstance(v, str)
+            else INTEGER if isinstance(v, (int, np.integer))
+            else NUMBER
+            for v in cells
+        ], dtype=np.int8)
+        is_text = kind == TEXT
+        number = np.full(len(cells), np.nan)
+        number[~is_text] = cells[~is_text].astype(float)
+        text = np.where(is_text, cells, None)
+        parts.append(pd.DataFrame({
+            'sheet': sheet,
+            'row': rows.astype(np.int32),
+            'col': cols.astype(np.int32),
+            'kind': kind,
+            'number': number,
+            'text': text,
+        }))
+    return pd.concat(parts, ignore_index=True)
+
+
+def cells_to_grids(cells):
+    """Rebuild the raw sheet grids from the long-format cell frame"""
+    grids = {}
+    for sheet, group in cells.groupby('sheet', sort=False):
+        shape = (group['row'].max() + 1, group['col'].max() + 1)
+        values = np.full(shape, np.nan, dtype=object)
+        kind = group['kind'].to_numpy()
+        number = group['number'].to_numpy()
+        cell_values = np.where(kind == TEXT, group['text'].to_numpy(), number)
+        cell_values = cell_values.astype(object)
+        is_int = kind == INTEGER
+        cell_values[is_int] = number[is_int].astype(np.int64)
+        values[group['row'].to_numpy(), group['col'].to_numpy()] = cell_values
+        grids[sheet] = pd.DataFrame(values)
+    return grids
+
+
+def load_sheet_grids(path=WORKBOOK, sheets=SHEETS, cache_dir=CACHE_DIR):
+    """Return raw grids for the requested sheets, using the cache if possible
+
+    The cache file name includes the workbook's content hash, so editing the
+    workbook simply misses the cache. Without pyarrow the cache is skipped.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, f'{stem}-{workbook_hash(path)[:16]}.feather')
+    if os.path.exists(cache_path):
+        try:
+            grids = cells_to_grids(pd.read_feather(cache_path))
+            if all(sheet in grids for sheet in sheets):
+                return {sheet: grids[sheet] for sheet in sheets}
+        except ImportError:
+            pass
+
+    grids = read_sheet_grids(path, sheets)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        grids_to_cells(grids).to_feather(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except ImportError:
+        pass
+    return grids
+
+
+def block_starts(grid):
+    """Row numbers where each stacked block begins
+
+    A block starts at the top of the sheet and at any row following a blank
+    row that has a header beyond the first column. Footnote rows only fill
+    the first column, so they stay attached to the block above them.
+    """
+    blank = grid.isna().all(axis=1).to_numpy()
+    has_header = grid.iloc[:, 1:].notna().any(axis=1).to_numpy()
+    starts = [0]
+    for row in range(1, len(grid)):
+        if blank[row - 1] and not blank[row] and has_header[row]:
+            starts.append(row)
+    return starts
+
+
+def parse_block(block):
+    """Turn one block of raw cells into a frame with two-level headers
+
+    Matches pd.read_excel(header=[0, 1], index_col=0) followed by
+    dropna(axis=1, how='all').
+    """
+    header = block.iloc[:2, 1:]
+    level0 = header.iloc[0].ffill()
+    names = [block.iat[0, 0], block.iat[1, 0]]
+    names = [None if pd.isna(name) else name for name in names]
+    columns = pd.MultiIndex.from_arrays(
+        [pd.Index(level0.tolist()), pd.Index(header.iloc[1].tolist())],
+        names=names)
+
+    data = block.iloc[2:, 1:].copy()
+    data.columns = columns
+    data.index = pd.Index(block.iloc[2:, 0].tolist(), name=None)
+    data = data.dropna(axis=1, how='all')
+    return data.infer_objects()
+
+
+def split_blocks(grid):
+    """Split a sheet grid into its parsed blocks, in sheet order"""
+    starts = block_starts(grid)
+    stops = starts[1:] + [len(grid)]
+    blocks = []
+    for start, stop in zip(starts, stops):
+        block = grid.iloc[start:stop]
+        # Drop the blank separator row(s) before the next block
+        if stop != len(grid):
+            while block.iloc[-1].isna().all():
+                block = block.iloc[:-1]
+        blocks.append(parse_block(block))
+    return blocks
+
+
+def extract_workbook(path=WORKBOOK, sheets=SHEETS, cache_dir=CACHE_DIR):
+    """Parse every sheet of the workbook into its UK and London blocks
+
+    Returns:
+        dict: Sheet name to list of block frames, e.g.
+            {'Gender': [uk_gender, ldn_gender], ...}
+    """
+    grids = load_sheet_grids(path, sheets, cache_dir)
+    return {sheet: split_blocks(grids[sheet]) for sheet in sheets}
+
+
+def breakdown_frame(block, dimension, dropna=True):
+    """Reshape one block into long format for the generic breakdown table
+
+    Each level-0 column group becomes a category; its percent and conf
+    sub-columns become the rate and 95% confidence interval. Markers such as
+    '-', '!' or '*' are treated as missing, and rows without a rate are
+    dropped unless dropna is False.
+
+    Returns:
+        pd.DataFrame: time, region, dimension, category, rate, conf
+    """
+    region = REGION_CODES.get(block.columns.names[0], block.columns.names[0])
+    rates = block.xs('percent', axis=1, level=1)
+    confs = block.xs('conf', axis=1, level=1).reindex(columns=rates.columns)
+    rates = rates.apply(pd.to_numeric, errors='coerce')
+    confs = confs.apply(pd.to_numeric, errors='coerce')
+
+    periods = rates.index.to_series().notna().to_numpy()
+    rates, confs = rates[periods], confs[periods]
+    categories = list(rates.columns)
+    long = pd.DataFrame({
+        'time': np.repeat(rates.index.to_numpy(), len(categories)),
+        'region': region,
+        'dimension': dimension,
+        'category': np.tile(categories, len(rates)),
+        'rate': rates.to_numpy(dtype=float).ravel(),
+        'conf': confs.to_numpy(dtype=float).ravel(),
+    })
+    if dropna:
+        long = long.dropna(subset=['rate']).reset_index(drop=True)
+    return long
+
+
+def breakdown_rows(frames, sheets=BREAKDOWN_SHEETS, dropna=True):
+    """Long-format rows for every block of the given sheets"""
+    return pd.concat([
+        breakdown_frame(block, sheet, dropna)
+        for sheet in sheets
+        for block in frames[sheet]
+    ], ignore_index=True)
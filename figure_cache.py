@@ -0,0 +1,97 @@
+"""In-process cache for chart figures.
+
+Figures are keyed by chart and dropdown value together with the version of
+the data store's snapshot, so once a rebuilt ``unemployment.db`` has been
+loaded every cached figure is invalidated automatically.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import metrics
+from fork_hooks import register_after_fork
+
+MAX_ENTRIES = int(os.environ.get('FIGURE_CACHE_SIZE', '128'))
+
+
+class FigureCache:
+    """Thread-safe LRU cache of serialized figures bound to a database version."""
+
+    def __init__(self, maxsize=MAX_ENTRIES):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _sync_version(self, version):
+        # Entries built against an older database can never be hit again
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            self._sync_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        """Store value under key, evicting the least recently used entry."""
+        with self._lock:
+            self._sync_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+
+figure_cache = FigureCache()
+register_after_fork(figure_cache._after_fork)
+
+
+def _serialize(figure):
+    if hasattr(figure, 'to_dict'):
+        return figure.to_dict()
+    return figure
+
+
+def cached(key, version, build, cache=figure_cache):
+    """Return the figure cached under key, building and storing it on a miss.
+
+    Args:
+        key: Hashable cache key
+        version: Version of the data the figure is built from
+        build (callable): Returns the figure (or None for no figure)
+        cache (FigureCache): Cache to use
+
+    Returns:
+        dict: The figure as a plain dict
+    """
+    figure = cache.get(key, version)
+    if figure is None:
+        with metrics.phase('figure'):
+            figure = build()
+        with metrics.phase('serialize'):
+            figure = _serialize(figure)
+        cache.put(key, version, figure)
+    return figure
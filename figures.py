@@ -0,0 +1,97 @@
+"""Compact trace building for the dashboard's time series charts.
+
+Traces are given numpy arrays rather than lists, so plotly serializes the
+numeric values as base64 typed arrays instead of JSON lists of floats. Series
+longer than the point budget are downsampled with Largest-Triangle-Three-
+Buckets (LTTB), which keeps the peaks and troughs a plain stride would drop.
+"""
+import os
+
+import plotly.graph_objects as go
+
+# Most points drawn per trace; 0 disables downsampling
+MAX_POINTS = int(os.environ.get('FIGURE_MAX_POINTS', '1000'))
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points LTTB keeps when reducing a series to threshold.
+
+    Args:
+        x (np.ndarray): Numeric x positions, ascending
+        y (np.ndarray): Values at each position; NaNs are never preferred
+        threshold (int): Number of points to keep
+
+    Returns:
+        np.ndarray: Sorted indices into x and y, always including both ends
+    """
+    import numpy as np
+
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        with np.errstate(invalid='ignore'):
+            avg_x = np.nanmean(x[end:next_end])
+            avg_y = np.nanmean(y[end:next_end])
+        # Twice the area of the triangle from the last kept point to each
+        # candidate and the average of the next bucket
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        kept[i + 1] = a
+    return kept
+
+
+def downsample(x, *columns, max_points=None):
+    """Reduce a series and any parallel columns to the point budget.
+
+    The first column is the one LTTB preserves the shape of. Non-numeric x
+    values (e.g. period names) are placed at their positions.
+
+    Returns:
+        tuple: x and each column as numpy arrays
+    """
+    # numpy is imported on first render so importing the app stays fast
+    import numpy as np
+
+    max_points = MAX_POINTS if max_points is None else max_points
+    x = np.asarray(x)
+    columns = [np.asarray(column, dtype=float) for column in columns]
+    if max_points and len(x) > max_points and columns:
+        positions = (x.astype(float) if np.issubdtype(x.dtype, np.number)
+                     else np.arange(len(x), dtype=float))
+        kept = lttb_indices(positions, columns[0], max_points)
+        x = x[kept]
+        columns = [column[kept] for column in columns]
+    if x.dtype == object:
+        x = x.tolist()
+    return (x, *columns)
+
+
+def line_trace(x, y, error=None, max_points=None, **kwargs):
+    """A go.Scatter line with compact, downsampled arrays.
+
+    Args:
+        x: Period names or years
+        y: Values to plot
+        error: Optional symmetric error bar sizes, downsampled with y
+        max_points (int): Point budget; defaults to FIGURE_MAX_POINTS
+        **kwargs: Other go.Scatter properties (name, line, ...)
+
+    Returns:
+        go.Scatter: The trace
+    """
+    if error is None:
+        x, y = downsample(x, y, max_points=max_points)
+    else:
+        x, y, error = downsample(x, y, error, max_points=max_points)
+        kwargs['error_y'] = {'type': 'data', 'array': error, 'visible': True}
+    return go.Scatter(x=x, y=y, **kwargs)
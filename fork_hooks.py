@@ -0,0 +1,17 @@
+"""Hooks re-initialising process state in forked children.
+
+Background jobs (see background.py) run in processes forked from the
+threaded server. A lock held by another thread at the moment of fork() is
+copied in its held state and would never be released in the child, so
+every module keeping a lock registers a callback here to replace it.
+"""
+import os
+
+
+def register_after_fork(callback):
+    """Call callback() in every child process forked from this one.
+
+    A no-op on platforms without fork(), such as Windows.
+    """
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=callback)
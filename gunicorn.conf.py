@@ -0,0 +1,27 @@
+"""Gunicorn settings for serving the dashboard in production.
+
+Run with ``gunicorn -c gunicorn.conf.py``. Every setting can be overridden
+through the environment variables below.
+"""
+import multiprocessing
+import os
+import sys
+
+# Gunicorn loads this file by path, before putting its directory on sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import serving  # noqa: E402
+
+wsgi_app = 'wsgi:server'
+bind = f'{serving.HOST}:{serving.PORT}'
+
+# Processes and threads per process
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = serving.THREADS
+worker_class = 'gthread'
+
+# Import wsgi.py (and warm its data) once in the master before forking, so
+# workers share the loaded frames copy-on-write
+preload_app = True
+
+timeout = int(os.environ.get('TIMEOUT', '30'))
+accesslog = os.environ.get('ACCESS_LOG', '-')
@@ -0,0 +1,110 @@
+"""HTTP validators and cache headers for the dashboard's Flask server.
+
+Callback responses only change when the data or the app's code does, so
+their ETag is derived from the data version, the code fingerprint, the
+query string and the request body. A request whose If-None-Match already
+holds that ETag gets a 304 before the callback runs. Browsers do not
+revalidate POST requests by themselves, so assets/callback_cache.js keeps
+the last answers on the page and sends their ETags with repeated requests.
+The layout and dependency JSON get content ETags with conditional GET
+handling, and files under the assets folder get long-lived Cache-Control
+headers, immutable for the version-pinned files under assets/vendor/.
+"""
+import hashlib
+
+from flask import request
+from werkzeug.http import http_date
+
+UPDATE_PATH = '/_dash-update-component'
+ASSETS_PATH = '/assets/'
+
+# Folder of version-pinned third-party files
+IMMUTABLE_PREFIX = ASSETS_PATH + 'vendor/'
+
+ONE_YEAR = 365 * 24 * 60 * 60
+ONE_DAY = 24 * 60 * 60
+
+# The index page embeds a per-request token, so only JSON is revalidated
+REVALIDATED_TYPES = ('application/json',)
+
+
+def source_fingerprint(*paths):
+    """Short hash of the given source files' contents."""
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def callback_etag(salt, version, body, query_string=b''):
+    """Weak ETag of a callback response.
+
+    Weak, because gzip and identity encodings of the response share it.
+    """
+    digest = hashlib.sha1(f'{salt}|{version}|'.encode())
+    digest.update(query_string + b'|')
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def asset_cache_control(path, args):
+    """Cache-Control for a file under the assets folder."""
+    # Dash fingerprints the assets it links with ?m=<modified time>
+    if path.startswith(IMMUTABLE_PREFIX) or 'm' in args:
+        return f'public, max-age={ONE_YEAR}, immutable'
+    return f'public, max-age={ONE_DAY}'
+
+
+def enable_http_caching(server, version, salt='', last_modified=None):
+    """Add ETag, Last-Modified and Cache-Control handling to a Flask server.
+
+    Args:
+        server (flask.Flask): The Dash app's server
+        version (callable): Returns the version of the data being served
+        salt (str): Changes whenever the app's figures could change for
+            the same data, e.g. a fingerprint of the source code
+        last_modified (callable): Returns the data's modification time as a
+            Unix timestamp, or None if unknown, sent as Last-Modified on
+            callback responses
+    """
+    @server.before_request
+    def _check_callback_etag():
+        if request.method != 'POST' or request.path != UPDATE_PATH:
+            return None
+        # A background job poll repeats the same request while the job's
+        # answer changes from progress to result, so it gets no validator
+        if 'job' in request.args or 'cacheKey' in request.args:
+            return None
+        etag = callback_etag(salt, version(), request.get_data(),
+                             request.query_string)
+        request.environ['dashboard.etag'] = etag
+        if request.if_none_match.contains_weak(etag):
+            response = server.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        return None
+
+    @server.after_request
+    def _add_cache_headers(response):
+        if request.path.startswith(ASSETS_PATH):
+            if response.status_code in (200, 304):
+                response.headers['Cache-Control'] = asset_cache_control(
+                    request.path, request.args)
+            return response
+
+        etag = request.environ.get('dashboard.etag')
+        if etag is not None and response.status_code == 200:
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'no-cache'
+            modified = last_modified() if last_modified is not None else None
+            if modified is not None:
+                response.headers['Last-Modified'] = http_date(modified)
+        elif (request.method == 'GET' and response.status_code == 200
+                and not response.direct_passthrough
+                and response.mimetype in REVALIDATED_TYPES
+                and 'ETag' not in response.headers):
+            response.add_etag()
+            response.headers['Cache-Control'] = 'no-cache'
+            response.make_conditional(request)
+        return response
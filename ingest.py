@@ -0,0 +1,265 @@
+"""Parallel ingestion of many regional unemployment workbooks.
+
+We receive one workbook per region and release, each laid out like
+annual-unemployment-region.xlsx: Gender, Disability and Ethnicity sheets of
+stacked region blocks. Parsing a workbook with openpyxl is CPU-bound, so
+:func:`parse_workbooks` hashes, parses and validates the workbooks in a
+process pool. A workbook whose content hash matches the one last loaded is
+skipped before it is parsed. 2_create_database.py then merges the parsed
+values into the database in one transaction::
+
+    python 2_create_database.py --workbooks workbooks/ --incremental
+
+Run directly to parse and check workbooks without touching the database::
+
+    python ingest.py workbooks/ [--workers 4]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import validation
+from extract import BREAKDOWN_SHEETS, WORKBOOK, extract_workbook, workbook_hash
+
+WORKBOOK_PATTERN = '*.xlsx'
+
+# Gender sheet categories loaded into UnemploymentRateByGender, for the
+# region the dashboard's gender chart shows
+GENDER_CATEGORIES = {'Unemployment rate males - aged 16+': 'Male',
+                     'Unemployment rate females - aged 16+': 'Female'}
+GENDER_REGION = 'LDN'
+# Gender sheet category loaded into UnemploymentRateByRegion for every region
+REGION_CATEGORY = 'Unemployment rate - aged 16+'
+
+Workbook = namedtuple('Workbook', [
+    'name',  # SourceFile key: path relative to the directory it was found in
+    'path',  # workbook file
+])
+
+ParsedWorkbook = namedtuple('ParsedWorkbook', [
+    'name',          # SourceFile key of the workbook
+    'path',          # workbook file
+    'content_hash',  # SHA-256 of its bytes
+    'status',        # 'parsed', 'skipped' (unchanged), 'invalid' or 'error'
+    'values',        # long frame with validation.COLUMNS, or None
+    'report',        # validation report, or None
+    'error',         # why parsing failed, or None
+    'timings',       # seconds spent per step: hash, parse, validate
+])
+
+
+def discover(paths, pattern=WORKBOOK_PATTERN):
+    """Workbook files named by paths, searching directories recursively
+
+    A workbook found in a directory is named by its path relative to that
+    directory, so 2024/london.xlsx and 2025/london.xlsx are tracked apart;
+    a workbook passed directly is named by its file name. Excel lock files
+    (~$book.xlsx) are ignored.
+
+    Returns:
+        list: A Workbook per file, sorted by name, so when two workbooks
+            hold the same rate the later release wins. An incremental load
+            keeps that order by re-parsing the unchanged workbooks that sort
+            after a changed one (see :func:`reparse_later`).
+    """
+    found = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for match in glob.glob(os.path.join(path, '**', pattern),
+                                   recursive=True):
+                name = os.path.relpath(match, path).replace(os.sep, '/')
+                found[name] = match
+        else:
+            found[os.path.basename(path)] = path
+    return [Workbook(name, path) for name, path in sorted(found.items())
+            if not os.path.basename(path).startswith('~$')]
+
+
+def parse_workbook(workbook, known_hash=None, validate=True):
+    """Hash, parse and validate one workbook; runs in a worker process
+
+    Args:
+        workbook (Workbook): The workbook's name and file
+        known_hash (str): Hash of the version already loaded, if any; a
+            workbook with this hash is skipped without being parsed
+        validate (bool): Run the data-quality rules over its values
+
+    Returns:
+        ParsedWorkbook: Never raises, so one bad file cannot take down the
+            pool; failures are reported through status and error
+    """
+    name, path = workbook
+    timings = {}
+    start = time.perf_counter()
+    try:
+        content_hash = workbook_hash(path)
+    except OSError as e:
+        return ParsedWorkbook(name, path, None, 'error', None, None, str(e),
+                              timings)
+    timings['hash'] = time.perf_counter() - start
+    if content_hash == known_hash:
+        return ParsedWorkbook(name, path, content_hash, 'skipped', None, None,
+                              None, timings)
+
+    start = time.perf_counter()
+    try:
+        values = validation.workbook_frame(extract_workbook(path))
+    except Exception as e:
+        return ParsedWorkbook(name, path, content_hash, 'error', None, None,
+                              f'{type(e).__name__}: {e}', timings)
+    timings['parse'] = time.perf_counter() - start
+
+    report = None
+    if validate:
+        start = time.perf_counter()
+        report = validation.validate(values)
+        timings['validate'] = time.perf_counter() - start
+    status = 'parsed' if report is None or report['passed'] else 'invalid'
+    return ParsedWorkbook(name, path, content_hash, status, values, report,
+                          None, timings)
+
+
+def parse_workbooks(workbooks, known_hashes=None, validate=True, workers=None):
+    """Parse workbooks in a process pool
+
+    Args:
+        workbooks (list): Workbooks from discover()
+        known_hashes (dict): Workbook name to the hash last loaded
+        validate (bool): Run the data-quality rules over each workbook
+        workers (int): Worker processes; defaults to one per CPU. A single
+            workbook or worker is parsed in this process.
+
+    Returns:
+        list: A ParsedWorkbook per workbook, in the order given
+    """
+    known_hashes = known_hashes or {}
+    jobs = [(workbook, known_hashes.get(workbook.name), validate)
+            for workbook in workbooks]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [parse_workbook(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_workbook, *zip(*jobs)))
+
+
+def reparse_later(results, validate=True, workers=None):
+    """Re-parse skipped workbooks that sort after a changed one
+
+    An incremental load parses only the workbooks whose content changed, so
+    merging them alone would let an older release, such as a re-saved
+    2024/london.xlsx, overwrite the rates it shares with 2025/london.xlsx.
+    Parsing every unchanged workbook named after the first changed one
+    restores the full-build result, where the later release wins.
+
+    Args:
+        results (list): ParsedWorkbooks from parse_workbooks(), sorted by name
+        validate (bool): Run the data-quality rules over each workbook
+        workers (int): Worker processes; defaults to one per CPU
+
+    Returns:
+        list: results with those workbooks parsed, in the same order
+    """
+    changed = [i for i, result in enumerate(results)
+               if result.status != 'skipped']
+    if not changed:
+        return results
+    later = [i for i in range(changed[0], len(results))
+             if results[i].status == 'skipped']
+    if not later:
+        return results
+    reparsed = parse_workbooks(
+        [Workbook(results[i].name, results[i].path) for i in later],
+        validate=validate, workers=workers)
+    results = list(results)
+    for i, result in zip(later, reparsed):
+        results[i] = result
+    return results
+
+
+def merge_values(results):
+    """One long frame of every parsed workbook's values
+
+    A rate present in several workbooks, such as the UK block every
+    regional workbook carries, is kept once, from the last workbook. Rows
+    are in period order so new periods get increasing IDs.
+    """
+    frames = [result.values for result in results
+              if result.status == 'parsed']
+    if not frames:
+        return pd.DataFrame(columns=validation.COLUMNS)
+    values = pd.concat(frames, ignore_index=True).drop_duplicates(
+        subset=['dimension', 'region', 'category', 'time'], keep='last')
+    order = validation.period_years(values['time']).argsort(kind='stable')
+    return values.iloc[order].reset_index(drop=True)
+
+
+def fact_frames(values):
+    """Split merged values into the rows of each fact table
+
+    Returns:
+        dict: 'gender' (time, gender, rate), 'region' (time, region, rate)
+            and 'breakdown' (time, region, dimension, category, rate, conf)
+    """
+    gender_sheet = values[values['dimension'] == 'Gender']
+    gender = gender_sheet[(gender_sheet['region'] == GENDER_REGION)
+                          & gender_sheet['category'].isin(GENDER_CATEGORIES)]
+    region = gender_sheet[gender_sheet['category'] == REGION_CATEGORY]
+    breakdown = values[values['dimension'].isin(BREAKDOWN_SHEETS)
+                       & values['rate'].notna()]
+    return {
+        'gender': pd.DataFrame({
+            'time': gender['time'],
+            'gender': gender['category'].map(GENDER_CATEGORIES),
+            'rate': gender['rate']}).reset_index(drop=True),
+        'region': region[['time', 'region', 'rate']].reset_index(drop=True),
+        'breakdown': breakdown[['time', 'region', 'dimension', 'category',
+                                'rate', 'conf']].reset_index(drop=True),
+    }
+
+
+def summary(results):
+    """One line per workbook with its outcome and timings, for the console"""
+    lines = []
+    for result in results:
+        timings = ' '.join(f'{step} {seconds:.3f}s'
+                           for step, seconds in result.timings.items())
+        detail = result.error or (
+            f'{len(result.values)} values' if result.values is not None
+            else 'unchanged')
+        lines.append(f'{result.path}: {result.status} ({detail}) {timings}')
+    return '\n'.join(lines)
+
+
+def validation_reports(results):
+    """Validation reports of the workbooks that were checked, by name"""
+    return {result.name: result.report for result in results
+            if result.report is not None}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Parse and check unemployment workbooks without loading them')
+    parser.add_argument('paths', nargs='*', default=[WORKBOOK],
+                        help='workbooks, or directories to search for them')
+    parser.add_argument('--workers', type=int,
+                        help='worker processes (default: one per CPU)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    results = parse_workbooks(discover(args.paths), workers=args.workers)
+    print(summary(results))
+    print(f'{len(results)} workbook(s) in {time.perf_counter() - start:.3f}s')
+    return 0 if all(result.status == 'parsed' for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""Latency instrumentation for the dashboard's server callbacks.
+
+Each callback wrapped with :func:`instrumented` runs inside a trace that
+times its phases:
+
+* ``snapshot`` - reading the builder's memory-mapped snapshot file
+* ``sql`` - queries run through data_access.read_sql
+* ``transform`` - pandas reshaping of query results into chart series
+* ``figure`` - building the plotly figure
+* ``serialize`` - converting the figure to a plain dict
+
+Phase times are exclusive: a query run while a figure is being built counts
+towards ``sql`` only. The data store loads its frames outside any callback
+(in the ETag check before a request, or in its refresh thread), so each
+load runs in a :func:`traced` block of its own, recorded under the callback
+label ``data_load``. Durations are collected into histograms and exposed in
+the Prometheus text format by the ``/metrics`` route added by
+:func:`register`. Setting SLOW_CALLBACK_MS logs a trace, with the SQL that
+ran, for every callback slower than that many milliseconds.
+
+Metrics live in the memory of the process that records them. Callbacks run
+as background jobs (see background.py) execute in a forked child process,
+so their timings are lost when the job exits and never reach ``/metrics``.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from fork_hooks import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+# Callbacks slower than this are logged with their trace; 0 disables it
+SLOW_CALLBACK_MS = float(os.environ.get('SLOW_CALLBACK_MS', '0'))
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+           0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(
+        name, str(value).replace('\\', r'\\').replace('"', r'\"'))
+        for name, value in pairs)
+    return '{' + body + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        """Add amount to the series identified by labels."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        """Current value of the series identified by labels."""
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield self.name + '_total', self.labelnames, labels, (), value
+
+
+class Histogram:
+    """Cumulative histogram of observed durations with optional labels."""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        """Record one observation for the series identified by labels."""
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def count(self, *labels):
+        """Number of observations in the series identified by labels."""
+        series = self._series.get(labels)
+        return series[1] if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, (list(series[0]), series[1], series[2]))
+                           for labels, series in self._series.items())
+        for labels, (counts, count, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield (self.name + '_bucket', self.labelnames, labels,
+                       (('le', _format_value(bound)),), cumulative)
+            yield self.name + '_count', self.labelnames, labels, (), count
+            yield self.name + '_sum', self.labelnames, labels, (), total
+
+
+callback_calls = Counter(
+    'dash_callback_calls', 'Dash callback invocations', ['callback'])
+callback_errors = Counter(
+    'dash_callback_errors', 'Dash callbacks that raised', ['callback'])
+callback_seconds = Histogram(
+    'dash_callback_duration_seconds', 'Wall time of Dash callbacks',
+    ['callback'])
+phase_seconds = Histogram(
+    'dash_callback_phase_seconds',
+    'Exclusive time spent in each phase of a Dash callback',
+    ['callback', 'phase'])
+sql_seconds = Histogram(
+    'sql_query_duration_seconds', 'Wall time of SQLite queries')
+
+REGISTRY = [callback_calls, callback_errors, callback_seconds, phase_seconds,
+            sql_seconds]
+
+
+def _reset_after_fork():
+    for metric in REGISTRY:
+        metric._lock = threading.Lock()
+
+
+register_after_fork(_reset_after_fork)
+
+
+def render(registry=None):
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY if registry is None else registry:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for name, labelnames, labels, extra, value in metric.samples():
+            lines.append('{}{} {}'.format(
+                name, _format_labels(labelnames, labels, extra),
+                _format_value(value)))
+    return '\n'.join(lines) + '\n'
+
+
+class Trace:
+    """Phase timings and queries of one callback invocation."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.phases = {}
+        self.queries = []
+        self._stack = []
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+_local = threading.local()
+
+
+def current_trace():
+    """The trace of the callback running on this thread, if any."""
+    return getattr(_local, 'trace', None)
+
+
+@contextmanager
+def phase(name):
+    """Time a block as the named phase of the current callback's trace.
+
+    Time spent in nested phases is subtracted, so every phase records only
+    its own work. Outside a traced callback this is a no-op.
+    """
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    trace._stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = trace._stack.pop()
+        trace.add(name, elapsed - nested)
+        if trace._stack:
+            trace._stack[-1] += elapsed
+
+
+@contextmanager
+def timed_query(query):
+    """Time a SQL query as the ``sql`` phase and record it on the trace."""
+    start = time.perf_counter()
+    with phase('sql'):
+        yield
+    elapsed = time.perf_counter() - start
+    sql_seconds.observe(elapsed)
+    trace = current_trace()
+    if trace is not None:
+        trace.queries.append((' '.join(query.split()), elapsed))
+
+
+def _log_slow(trace, elapsed):
+    phases = ', '.join(f'{name}={seconds * 1000:.1f}ms'
+                       for name, seconds in sorted(trace.phases.items()))
+    lines = [f'Slow callback {trace.callback}: {elapsed * 1000:.1f}ms '
+             f'({phases or "no phases"})']
+    for query, seconds in trace.queries:
+        lines.append(f'  {seconds * 1000:.1f}ms {query}')
+    logger.warning('\n'.join(lines))
+
+
+@contextmanager
+def traced(name):
+    """Time a block as one invocation of the named callback, with its phases.
+
+    Blocks can nest, e.g. a data load inside a callback; only the outermost
+    one is traced, so inner phases count towards the outer trace.
+    """
+    if current_trace() is not None:
+        yield
+        return
+    trace = _local.trace = Trace(name)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        callback_errors.inc(name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _local.trace = None
+        callback_calls.inc(name)
+        callback_seconds.observe(elapsed, name)
+        for phase_name, seconds in trace.phases.items():
+            phase_seconds.observe(seconds, name, phase_name)
+        if SLOW_CALLBACK_MS and elapsed * 1000 >= SLOW_CALLBACK_MS:
+            _log_slow(trace, elapsed)
+
+
+def instrumented(name):
+    """Decorator timing a Dash callback and its phases under the given name."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with traced(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def register(server, path='/metrics'):
+    """Add a route serving every metric to the app's Flask server."""
+    def metrics_view():
+        return render(), 200, {'Content-Type': CONTENT_TYPE}
+    server.add_url_rule(path, 'metrics', metrics_view)
@@ -0,0 +1,12 @@
+"""Settings shared by the production servers.
+
+Read by wsgi.py (waitress) and gunicorn.conf.py, so both bind to the same
+address and run the same number of threads per process unless the
+environment says otherwise.
+"""
+import os
+
+HOST = os.environ.get('HOST', '0.0.0.0')
+PORT = int(os.environ.get('PORT', '8050'))
+# Request threads per process
+THREADS = int(os.environ.get('THREADS', '4'))
@@ -0,0 +1,205 @@
+"""Compact memory-mapped snapshot of the dashboard's query results.
+
+2_create_database.py writes every dashboard query's rows to one file beside
+the database: rates as float32, periods as int16 codes and names such as
+regions, metrics and breakdown categories dictionary-encoded as small
+integer codes. The file is a JSON header followed by the raw column arrays,
+so a dashboard process maps it with one ``np.memmap`` and decodes each
+column with a few vectorized numpy operations. A cold start skips SQLite
+and the SQL-to-pandas conversion. The mapped bytes are shared through the
+page cache, but the decoded frames are not: decoding builds each worker's
+own arrays, as the chart series split from them would anyway.
+
+A snapshot records a stamp of the database file it was written from;
+:func:`read_snapshot` returns None for a snapshot that does not match the
+current database, and callers fall back to SQLite.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_access
+
+MAGIC = b'UNEMPSNP'
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+# Significant decimal digits a float32 holds exactly
+FLOAT32_DIGITS = 7
+
+# Query name -> column -> 'code' (dictionary-encoded text), 'period'
+# (int16 index into the shared period names), or a numpy dtype
+LAYOUT = {
+    'dashboard': {'PeriodName': 'period', 'RegionName': 'code',
+                  'Rate': 'float32'},
+    'gender': {'year': 'int16', 'male': 'float32', 'female': 'float32'},
+    'trend_metrics': {'Metric': 'code', 'PeriodName': 'period',
+                      'Value': 'float64'},
+    'breakdowns': {'Dimension': 'code', 'RegionName': 'code',
+                   'Category': 'code', 'PeriodName': 'period',
+                   'Rate': 'float32', 'ConfidenceInterval': 'float32'},
+}
+
+
+def snapshot_path(db_path):
+    """Snapshot file written beside a database file"""
+    return os.path.splitext(db_path)[0] + '.snapshot'
+
+
+def database_stamp(db_path):
+    """Size and SHA-256 of a database file's contents
+
+    Any rebuild or write that changes a rate changes the hash, even when the
+    file keeps its size and SQLite header, and the stamp survives copies and
+    checkouts of an unchanged file, unlike the modification time.
+    """
+    digest = hashlib.sha256()
+    with open(db_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return [os.path.getsize(db_path), digest.hexdigest()]
+
+
+def encode(frame, layout, periods):
+    """Column arrays and dictionaries for one query's frame"""
+    arrays, dictionaries = {}, {}
+    for column, kind in layout.items():
+        values = frame[column]
+        if kind == 'period':
+            arrays[column] = periods.get_indexer(values).astype(np.int16)
+        elif kind == 'code':
+            codes, uniques = pd.factorize(values)
+            dtype = np.int8 if len(uniques) < 128 else np.int16
+            arrays[column] = codes.astype(dtype)
+            dictionaries[column] = uniques.tolist()
+        else:
+            arrays[column] = values.to_numpy(dtype=kind)
+    return arrays, dictionaries
+
+
+def write_snapshot(conn, db_path, path=None):
+    """Write the dashboard queries' results from conn to a snapshot file
+
+    Args:
+        conn (sqlite3.Connection): Connection to the finished database
+        db_path (str): The database file, whose stamp the snapshot records
+        path (str): Snapshot file; defaults to snapshot_path(db_path)
+
+    Returns:
+        str: The snapshot file written
+    """
+    path = path or snapshot_path(db_path)
+    frames = {name: pd.read_sql_query(data_access.QUERIES[name], conn)
+              for name in LAYOUT}
+    periods = pd.Index(pd.unique(pd.concat([
+        frame['PeriodName'] for frame in frames.values()
+        if 'PeriodName' in frame])))
+
+    header = {'format': FORMAT_VERSION, 'database': database_stamp(db_path),
+              'periods': periods.tolist(), 'tables': {}}
+    blobs = []
+    offset = 0
+    for name, layout in LAYOUT.items():
+        arrays, dictionaries = encode(frames[name], layout, periods)
+        columns = {}
+        for column, array in arrays.items():
+            columns[column] = {'dtype': array.dtype.str, 'offset': offset,
+                               'length': len(array)}
+            blob = array.tobytes()
+            blobs.append(blob + bytes(-len(blob) % ALIGNMENT))
+            offset += len(blobs[-1])
+        header['tables'][name] = {'columns': columns,
+                                  'dictionaries': dictionaries}
+
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b' ' * (-(len(MAGIC) + 8 + len(header_bytes)) % ALIGNMENT)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, 'little'))
+        f.write(header_bytes)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return path
+
+
+def widen(rates):
+    """float64 copy of float32 rates rounded to 7 significant digits
+
+    7.3 is stored as 7.300000190734863; rounding to the precision float32
+    actually holds gives back 7.3, so figures and hover labels show the
+    values that went into the database.
+    """
+    rates = rates.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        magnitude = np.floor(np.log10(np.abs(rates)))
+    scale = 10.0 ** (FLOAT32_DIGITS - 1 - np.nan_to_num(
+        magnitude, nan=0.0, posinf=0.0, neginf=0.0))
+    return np.round(rates * scale) / scale
+
+
+def read_snapshot(path=None, db_path=None):
+    """Map a snapshot file and rebuild each query's frame from it
+
+    Args:
+        path (str): Snapshot file; defaults to the one beside db_path
+        db_path (str): Database the snapshot must match; defaults to the
+            data access layer's database
+
+    Returns:
+        dict: Query name to a frame shaped like its SQLite result, or None
+            if the file is missing, unreadable or from another build
+    """
+    db_path = db_path or data_access.get_pool().db_path
+    path = path or snapshot_path(db_path)
+    try:
+        mapped = np.memmap(path, dtype=np.uint8, mode='r')
+        stamp = database_stamp(db_path)
+    except (OSError, ValueError):
+        return None
+    # A truncated or corrupt file is treated like a missing one
+    try:
+        return decode(mapped, stamp)
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+def decode(mapped, stamp):
+    """Frames of a mapped snapshot, or None if it is from another build"""
+    if bytes(mapped[:len(MAGIC)]) != MAGIC:
+        return None
+    header_size = int.from_bytes(bytes(mapped[len(MAGIC):len(MAGIC) + 8]),
+                                 'little')
+    data_start = len(MAGIC) + 8 + header_size
+    header = json.loads(bytes(mapped[len(MAGIC) + 8:data_start]))
+    if header['format'] != FORMAT_VERSION or header['database'] != stamp:
+        return None
+
+    periods = np.array(header['periods'], dtype=object)
+    frames = {}
+    for name, layout in LAYOUT.items():
+        table = header['tables'][name]
+        columns = {}
+        for column, kind in layout.items():
+            spec = table['columns'][column]
+            # A view into the mapped file; decoding below makes the copy
+            array = np.frombuffer(mapped, dtype=spec['dtype'],
+                                  count=spec['length'],
+                                  offset=data_start + spec['offset'])
+            if kind == 'period':
+                columns[column] = periods[array]
+            elif kind == 'code':
+                dictionary = np.array(table['dictionaries'][column],
+                                      dtype=object)
+                columns[column] = dictionary[array]
+            elif kind == 'float32':
+                columns[column] = widen(array)
+            elif kind == 'int16':
+                columns[column] = array.astype(np.int64)
+            else:
+                columns[column] = array
+        frames[name] = pd.DataFrame(columns)
+    return frames
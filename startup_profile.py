@@ -0,0 +1,145 @@
+"""Startup profile of the dashboard: import cost and time to first response.
+
+Imports dash_app in a fresh interpreter under ``python -X importtime``, then
+answers the dashboard's charts request through Flask's test client. Reports
+the slowest modules by cumulative import time, the time to import the app
+and the time until the first charts response, which includes the deferred
+pandas and numpy imports and the data load::
+
+    python startup_profile.py
+    python startup_profile.py --top 30 --json startup.json
+
+Fails when a time exceeds its limit in STARTUP_BUDGET, or when importing the
+app already imports one of DEFERRED_MODULES.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Upper limits in milliseconds; generous so slow CI machines pass, while an
+# eager pandas import or a query at import time still shows up
+STARTUP_BUDGET = {'import_ms': 3000, 'first_response_ms': 6000}
+
+# Heavy modules the app must not import until the first callback needs them
+DEFERRED_MODULES = ('pandas', 'numpy')
+
+# Run in the child interpreter; prints its timings as JSON on stdout
+CHILD = f"""
+import json, sys, time
+start = time.perf_counter()
+import dash_app
+imported = time.perf_counter()
+deferred = sorted(set({DEFERRED_MODULES!r}) & set(sys.modules))
+import benchmark
+client = dash_app.app.server.test_client()
+response = client.post(benchmark.UPDATE_PATH, json=benchmark.charts_body())
+done = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'first_response_ms': (done - start) * 1000,
+    'status': response.status_code,
+    'deferred_imported': deferred,
+}}))
+"""
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(stderr):
+    """Per-module import times from ``-X importtime`` output.
+
+    Returns:
+        list: {'module', 'self_ms', 'cumulative_ms', 'depth'} per module,
+            in import order
+    """
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({'module': name,
+                            'self_ms': int(self_us) / 1000,
+                            'cumulative_ms': int(cumulative_us) / 1000,
+                            'depth': len(indent) // 2})
+    return modules
+
+
+def profile_startup(cwd=None):
+    """Start the app in a fresh interpreter and time it.
+
+    Args:
+        cwd (str): Directory to run in; defaults to this file's directory,
+            where dash_app.py and unemployment.db live
+
+    Returns:
+        dict: import_ms, first_response_ms and process_ms, the response
+            status, any deferred modules imported early, and every module's
+            import time
+    """
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        cwd=cwd, capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['process_ms'] = (time.perf_counter() - start) * 1000
+    report['modules'] = parse_importtime(result.stderr)
+    return report
+
+
+def check_budget(report, budget=STARTUP_BUDGET):
+    """List every startup result worse than its limit.
+
+    Returns:
+        list: Human-readable failures; empty if everything passed
+    """
+    failures = [f'{key} {report[key]:.0f} above {limit}'
+                for key, limit in budget.items() if report[key] > limit]
+    if report['status'] != 200:
+        failures.append(f"first response returned {report['status']}")
+    for name in report['deferred_imported']:
+        failures.append(f'{name} imported by dash_app at import time')
+    return failures
+
+
+def print_report(report, top=15):
+    """Print the slowest imports and the startup timings."""
+    slowest = sorted(report['modules'], key=lambda m: m['cumulative_ms'],
+                     reverse=True)[:top]
+    print(f"{'module':<40} {'self ms':>9} {'cumul. ms':>10}")
+    for module in slowest:
+        print(f"{module['module']:<40} {module['self_ms']:>9.1f} "
+              f"{module['cumulative_ms']:>10.1f}")
+    print(f"import dash_app:       {report['import_ms']:8.0f} ms")
+    print(f"first charts response: {report['first_response_ms']:8.0f} ms")
+    print(f"whole process:         {report['process_ms']:8.0f} ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--top', type=int, default=15,
+                        help='number of slowest modules to list')
+    parser.add_argument('--json', dest='json_path',
+                        help='also write the report to this file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = profile_startup()
+    print_report(report, args.top)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    failures = check_budget(report)
+    for failure in failures:
+        print(f'REGRESSION {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""Static export of the dashboard for serving without Python.
+
+Every chart on /dashboard is determined by unemployment.db, so this renders
+the home page, the dashboard page and every chart's figure for each of its
+dropdown values into a folder any static file server or CDN can serve::
+
+    python static_export.py                  # writes static/
+    python static_export.py --output public --force
+    python 2_create_database.py --export static
+
+The pages use plotly.js directly. A small script fetches each chart's figure
+JSON and swaps it when a dropdown changes, so no request reaches Python. The
+bundle records the database, code and assets it was rendered from, and an
+export is skipped while none of them has changed.
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+import sys
+from urllib.parse import quote
+
+import charts
+import dashboard_data
+import data_access
+import figures
+import snapshot_file
+from charts import CHARTS
+from http_cache import source_fingerprint
+
+OUTPUT_DIR = 'static'
+MANIFEST = 'manifest.json'
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'assets')
+
+PAGE = """<!DOCTYPE html>
+<html>
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1">
+        <title>Unemployment Insight Hub</title>
+{stylesheets}
+        <style>
+            :root {{
+                --page-background: url('{background}');
+            }}
+        </style>
+    </head>
+    <body>
+{body}
+    </body>
+</html>
+"""
+
+HOME_BODY = """        <div class="container">
+            <h1>Unemployment Insight Hub</h1>
+            <div style="display: flex; justify-content: center; margin-top: 50px">
+                <a class="dashboard-button" href="dashboard/">Go to Dashboard</a>
+            </div>
+        </div>"""
+
+# Loads each chart's figure and swaps it when the chart's dropdown changes
+DASHBOARD_SCRIPT = """(function () {
+    function show(chart, value) {
+        var url = '../figures/' + chart.dataset.chart +
+            (value === undefined ? '' : '/' + encodeURIComponent(value)) +
+            '.json';
+        fetch(url).then(function (response) {
+            return response.json();
+        }).then(function (figure) {
+            Plotly.react(chart, figure.data, figure.layout,
+                         {responsive: true});
+        });
+    }
+    document.querySelectorAll('.chart').forEach(function (chart) {
+        var control = document.getElementById(chart.dataset.chart + '-control');
+        if (!control) {
+            show(chart);
+            return;
+        }
+        show(chart, control.value);
+        control.addEventListener('change', function () {
+            show(chart, control.value);
+        });
+    });
+})();
+"""
+
+
+def figure_path(key, value=None):
+    """Bundle-relative path of a chart's figure for one dropdown value"""
+    if value is None:
+        return f'figures/{key}.json'
+    return f'figures/{key}/{quote(str(value), safe="")}.json'
+
+
+def relative(url, root):
+    """Point a site-absolute /assets/ URL at the bundle root"""
+    return root + url[1:] if url.startswith('/assets/') else url
+
+
+def page(body, root, stylesheets, background):
+    """One HTML page of the bundle.
+
+    Args:
+        body (str): Markup inside <body>
+        root (str): Relative path from the page to the bundle root
+        stylesheets (list): Third-party stylesheet URLs
+        background (str): Page background image URL
+    """
+    links = [relative(url, root) for url in stylesheets]
+    links.append(root + 'assets/dashboard.css')
+    return PAGE.format(
+        stylesheets='\n'.join(
+            f'        <link rel="stylesheet" href="{html.escape(url)}">'
+            for url in links),
+        background=html.escape(relative(background, root)),
+        body=body)
+
+
+def chart_section(spec):
+    """Markup for one chart's heading, plot and optional dropdown"""
+    lines = [
+        f'            <div class="dashboard-section" id="{spec.key}-section">',
+        f'                <h2><i class="{html.escape(spec.icon)}"></i> '
+        f'{html.escape(spec.heading)}</h2>',
+        f'                <div class="chart" id="{spec.element_id}" '
+        f'data-chart="{spec.key}"></div>',
+    ]
+    if spec.control is not None:
+        lines.append(f'                <select id="{spec.key}-control" '
+                     'class="form-select" '
+                     'style="width: 50%; margin: 20px auto">')
+        for option in spec.control['options']:
+            selected = (' selected' if option['value'] == spec.control['value']
+                        else '')
+            lines.append(
+                f'                    <option value="'
+                f'{html.escape(str(option["value"]))}"{selected}>'
+                f'{html.escape(option["label"])}</option>')
+        lines.append('                </select>')
+    lines.append('            </div>')
+    return '\n'.join(lines)
+
+
+def dashboard_body():
+    """Markup of the dashboard page: navigation and every chart section"""
+    nav = [f'                <a class="nav-link" href="#{spec.key}-section">'
+           f'{html.escape(spec.nav_label)}</a>' for spec in CHARTS]
+    nav.append('                <a class="back-button" href="../">'
+               '<i class="fas fa-home"></i> Back to Home</a>')
+    return '\n'.join([
+        '        <div class="container">',
+        '            <h1>Unemployment Insight Hub</h1>',
+        '            <div class="nav-menu" id="nav-menu" '
+        'style="position: sticky; top: 0; z-index: 1000">',
+        *nav,
+        '            </div>',
+        *(chart_section(spec) for spec in CHARTS),
+        '        </div>',
+        '        <script src="../assets/plotly.min.js"></script>',
+        '        <script src="../assets/dashboard.js"></script>',
+    ])
+
+
+def asset_files(root=None):
+    """Every file under the assets folder, in a stable order"""
+    root = root or ASSETS_DIR
+    return sorted(os.path.join(folder, name)
+                  for folder, _, names in os.walk(root) for name in names)
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def export(output=OUTPUT_DIR, force=False):
+    """Render the dashboard into a static bundle.
+
+    Args:
+        output (str): Folder to write; files from an older export are
+            overwritten
+        force (bool): Export even if the bundle matches the database
+
+    Returns:
+        dict: The bundle's manifest, or None if it was already up to date
+    """
+    import plotly.io as pio
+    from plotly.offline import get_plotlyjs
+
+    import dash_app
+
+    # The bundle changes with the data (the database file's content hash),
+    # the code drawing the figures and pages, or the stylesheets and images
+    # it links
+    stamp = {
+        'database': snapshot_file.database_stamp(
+            data_access.get_pool().db_path),
+        'source': source_fingerprint(charts.__file__, figures.__file__,
+                                     dash_app.__file__, __file__,
+                                     *asset_files()),
+    }
+    manifest_path = os.path.join(output, MANIFEST)
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f).get('stamp') == stamp:
+                return None
+
+    # The store may hold data loaded before the database was rebuilt
+    snapshot = dashboard_data.store.refresh()
+    paths = []
+    for spec in CHARTS:
+        for value in charts.control_values(spec):
+            path = figure_path(spec.key, value)
+            write(os.path.join(output, path), pio.to_json(
+                charts.render(snapshot, spec.key, value), validate=False))
+            paths.append(path)
+
+    write(os.path.join(output, 'index.html'),
+          page(HOME_BODY, '', dash_app.STYLESHEETS, dash_app.PAGE_BACKGROUND))
+    write(os.path.join(output, 'dashboard', 'index.html'),
+          page(dashboard_body(), '../', dash_app.STYLESHEETS,
+               dash_app.PAGE_BACKGROUND))
+
+    assets = os.path.join(output, 'assets')
+    write(os.path.join(assets, 'plotly.min.js'), get_plotlyjs())
+    write(os.path.join(assets, 'dashboard.js'), DASHBOARD_SCRIPT)
+    shutil.copy(os.path.join(ASSETS_DIR, 'dashboard.css'), assets)
+    shutil.copytree(os.path.join(ASSETS_DIR, 'vendor'),
+                    os.path.join(assets, 'vendor'), dirs_exist_ok=True)
+
+    manifest = {'stamp': stamp, 'figures': paths}
+    write(manifest_path, json.dumps(manifest, indent=2))
+    return manifest
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--output', default=OUTPUT_DIR,
+                        help='folder to write the bundle to')
+    parser.add_argument('--database', default=data_access.DB_PATH,
+                        help='database to render from')
+    parser.add_argument('--force', action='store_true',
+                        help='export even if the bundle is up to date')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    data_access.configure(args.database)
+    manifest = export(args.output, args.force)
+    if manifest is None:
+        print(f'{args.output} is up to date')
+    else:
+        print(f"Exported {len(manifest['figures'])} figures to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
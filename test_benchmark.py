@@ -0,0 +1,58 @@
+import os
+
+import benchmark
+import dash_app
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_percentiles_and_thresholds():
+    """Test 1: Verify percentiles and that a slow result fails its threshold"""
+    latencies = {'gender': [i / 1000 for i in range(1, 101)]}
+    report = benchmark.summarize(latencies, elapsed=0.5)
+    assert report['gender']['p50_ms'] == 50
+    assert report['gender']['p99_ms'] == 99
+    assert report['all']['rps'] == 200
+    baseline = benchmark.summarize(
+        {'gender': [i / 2000 for i in range(1, 101)]}, elapsed=0.2)
+    assert benchmark.check_thresholds(report, {'gender': {'p95_ms': 2.0},
+                                               'all': {'rps': 0.4}},
+                                      baseline) == []
+    failures = benchmark.check_thresholds(report, {'gender': {'p95_ms': 1.5},
+                                                   'all': {'rps': 0.5}},
+                                          baseline)
+    assert len(failures) == 2
+
+
+def test_baseline_matches_machine_and_settings(tmp_path):
+    """Test 2: Verify a baseline only applies to the run settings it was saved for"""
+    path = str(tmp_path / 'baseline.json')
+    settings = {'requests': 200, 'concurrency': 8}
+    assert benchmark.load_baseline(path, settings) is None
+    benchmark.save_baseline(path, settings, {'all': {'rps': 100}})
+    assert benchmark.load_baseline(path, settings) == {'all': {'rps': 100}}
+    assert benchmark.load_baseline(path, dict(settings, concurrency=1)) is None
+
+
+def test_every_callback_served(dashboard):
+    """Test 3: Verify the in-process server answers every callback case"""
+    server, base_url = benchmark.start_server(dash_app.app.server)
+    try:
+        cases = benchmark.callback_cases()
+        latencies, _ = benchmark.run_benchmark(base_url, cases, requests=2,
+                                               concurrency=4)
+    finally:
+        server.shutdown()
+    assert len(cases) == 7
+    assert all(len(values) == 2 for values in latencies.values())
+
+
+def test_run_without_baseline_fails(dashboard, tmp_path):
+    """Test 4: Verify a run only records a baseline when asked to, and fails without one"""
+    baseline = tmp_path / 'baseline.json'
+    args = ['--requests', '1', '--warmup', '0', '--baseline', str(baseline),
+            '--thresholds', os.path.join(HERE, benchmark.THRESHOLDS_FILE)]
+    assert benchmark.main(args) == 2
+    assert not baseline.exists()
+    assert benchmark.main(args + ['--save-baseline']) == 0
+    assert baseline.exists()
@@ -0,0 +1,214 @@
+import base64
+import json
+import re
+import time
+
+import numpy as np
+import pytest
+from dash import dcc
+
+import benchmark
+import charts
+import dash_app
+import dashboard_data
+
+PATHNAME = ('url', 'pathname', '/dashboard')
+
+
+def find(component, predicate):
+    """Every component in a layout tree matching predicate"""
+    found = [component] if predicate(component) else []
+    children = getattr(component, 'children', None)
+    if children is None or isinstance(children, str):
+        return found
+    if not isinstance(children, (list, tuple)):
+        children = [children]
+    for child in children:
+        found.extend(find(child, predicate))
+    return found
+
+
+def values(array):
+    """Decode a figure array, which plotly may send as base64 typed data"""
+    if isinstance(array, dict):
+        return np.frombuffer(base64.b64decode(array['bdata']),
+                             dtype=array['dtype']).tolist()
+    return list(array)
+
+
+def with_class(name):
+    return lambda c: getattr(c, 'className', None) == name
+
+
+def end_id(client):
+    """The signed page-load token a background job's handles are bound to"""
+    page = client.get('/').get_data(as_text=True)
+    config = re.search(r'<script id="_dash-config" type="application/json">'
+                       r'(.*?)</script>', page, re.S)
+    return json.loads(config.group(1))['end_id']
+
+
+def post(client, body, pathname, timeout=30):
+    """POST a callback request and return its outputs by JSON id
+
+    A background callback first answers with a job handle; the job is then
+    polled, as the renderer does, until its outputs are ready.
+    """
+    body['inputs'][0]['value'] = pathname
+    query = {'endId': end_id(client)}
+    response = client.post(benchmark.UPDATE_PATH, json=body, query_string=query)
+    assert response.status_code == 200
+    result = response.get_json()
+    if 'response' in result:
+        return result['response']
+
+    query.update(cacheKey=result['cacheKey'], job=result['job'])
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = client.post(benchmark.UPDATE_PATH, json=body,
+                               query_string=query)
+        assert response.status_code in (200, 204)
+        if response.status_code == 200 and 'response' in response.get_json():
+            return response.get_json()['response']
+    raise AssertionError(f'background job still running after {timeout}s')
+
+
+def update_charts(client, values=None, changed=None, pathname='/dashboard'):
+    """POST the dashboard's charts request; returns figures by chart key"""
+    outputs = post(client, benchmark.charts_body(values, changed), pathname)
+    return {json.loads(component_id)['chart']: props['figure']
+            for component_id, props in outputs.items()}
+
+
+def stored_figures(client, key, pathname='/dashboard'):
+    """POST a client-side chart's figure store request; returns its data"""
+    outputs = post(client, benchmark.figures_body(key), pathname)
+    return outputs['{"chart":"%s","type":"chart-figures"}' % key]['data']
+
+
+def test_home_page_layout(dashboard):
+    """Test 1: Verify the home page renders with the dashboard button"""
+    assert dashboard.get('/').status_code == 200
+    buttons = find(dash_app.display_page('/'), with_class('dashboard-button'))
+    assert len(buttons) == 1
+    assert buttons[0].children == 'Go to Dashboard'
+    assert buttons[0].href == '/dashboard'
+
+
+def test_dashboard_layout(dashboard):
+    """Test 2: Verify the dashboard has the nav menu, charts and dropdown"""
+    body = benchmark.request_body('page-content.children', [PATHNAME])
+    response = dashboard.post('/_dash-update-component', json=body)
+    assert b'"nav-menu"' in response.data
+
+    component = dash_app.display_page('/dashboard')
+    graphs = find(component, lambda c: isinstance(c, dcc.Graph))
+    assert [graph.id['chart'] for graph in graphs] == [
+        spec.key for spec in charts.CHARTS]
+    containers = {c.id for c in find(component,
+                                     lambda c: isinstance(c, dcc.Loading))}
+    assert {'gender-unemployment-chart', 'regional-unemployment-chart',
+            'london-unemployment-chart', 'trend-comparison-chart',
+            'disability-chart', 'ethnicity-chart'} <= containers
+    dropdown = find(component,
+                    lambda c: getattr(c, 'id', None) == 'trend-metric')
+    assert [o['label'] for o in dropdown[0].options] == [
+        'Gender Gap', 'Regional Variance', 'London vs National']
+
+
+def test_charts_in_one_request(dashboard):
+    """Test 3: Verify one request serves every chart from the fixture data"""
+    figures = update_charts(dashboard)
+    assert list(figures) == [spec.key for spec in charts.CHARTS
+                             if not spec.client_side]
+
+    gender = figures['gender']
+    assert [trace['name'] for trace in gender['data']] == ['Male', 'Female']
+    assert values(gender['data'][0]['y']) == [5.9, 4.6, 5.2]
+    assert {trace['name'] for trace in figures['regional']['data']} == {
+        'UK', 'LDN'}
+    assert values(figures['london']['data'][0]['y']) == [5.6, 4.4, 5.0]
+    assert [trace['name'] for trace in figures['disability']['data']] == [
+        'disabled', 'not disabled']
+    assert figures['ethnicity']['data'] == []
+
+    figures = update_charts(dashboard, {'disability-region': 'UK'},
+                            changed='disability-region')
+    assert list(figures) == ['disability']
+
+
+def test_trend_metrics_switch_client_side(dashboard):
+    """Test 4: Verify every trend metric's figure ships with the page load"""
+    # Clientside callbacks have no Python function
+    server_inputs = {i['id'] for spec in dash_app.app.callback_map.values()
+                     if 'callback' in spec for i in spec['inputs']}
+    assert 'trend-metric' not in server_inputs
+
+    stored = stored_figures(dashboard, 'trend')
+    metrics = charts.control_values(charts.CHARTS_BY_KEY['trend'])
+    assert set(stored) == set(metrics) | {'null'}
+    for metric in metrics:
+        trace = stored[metric]['data'][0]
+        assert trace['name'] == charts.TREND_METRIC_STYLES[metric][0]
+        assert values(trace['x']) == [
+            'Jan 2021-Dec 2021', 'Jan 2022-Dec 2022', 'Jan 2023-Dec 2023']
+    assert stored['null'] == stored['london_national']
+
+
+def test_charts_empty_off_dashboard(dashboard):
+    """Test 5: Verify the charts are blank on other pages"""
+    figures = update_charts(dashboard, pathname='/')
+    assert list(figures.values()) == [{}] * (len(charts.CHARTS) - 1)
+    assert stored_figures(dashboard, 'trend', pathname='/') is None
+
+
+def test_trend_figures_report_progress(dashboard):
+    """Test 6: Verify rendering the trend figures reports each step"""
+    steps = []
+    figures = charts.render_variants(dashboard_data.store.get(), 'trend',
+                                     progress=lambda *step: steps.append(step))
+    assert steps == [(done, len(figures)) for done in
+                     range(1, len(figures) + 1)]
+
+
+def test_trend_figures_background_job(dashboard):
+    """Test 7: Verify the trend figures render in a background job when enabled"""
+    if dash_app.BACKGROUND_MANAGER is None:
+        pytest.skip('diskcache and multiprocess are not installed')
+    body = benchmark.figures_body('trend')
+    body['inputs'][0]['value'] = '/dashboard'
+    response = dashboard.post(benchmark.UPDATE_PATH, json=body,
+                              query_string={'endId': end_id(dashboard)})
+    # The request only starts the job; its result comes from polling
+    assert {'cacheKey', 'job'} <= set(response.get_json())
+
+    stored = stored_figures(dashboard, 'trend')
+    assert set(stored) == set(charts.control_values(
+        charts.CHARTS_BY_KEY['trend'])) | {'null'}
+
+
+def test_repeated_callback_revalidated(dashboard):
+    """Test 8: Verify the page revalidates a repeated callback, getting a 304"""
+    assert b'/assets/callback_cache.js' in dashboard.get('/').data
+    body = benchmark.charts_body()
+    body['inputs'][0]['value'] = '/dashboard'
+    query = {'endId': end_id(dashboard)}
+    first = dashboard.post(benchmark.UPDATE_PATH, json=body, query_string=query)
+    again = dashboard.post(benchmark.UPDATE_PATH, json=body, query_string=query,
+                           headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert not again.data
+
+
+def test_page_needs_no_network(dashboard):
+    """Test 9: Verify the page links only local files, and the vendored ones are served"""
+    page = dashboard.get('/').get_data(as_text=True)
+    urls = re.findall(r'(?:href|src)="([^"]+)"', page)
+    urls += re.findall(r"url\('([^']+)'\)", page)
+    assert urls and all(url.startswith('/') for url in urls), urls
+    for url in dash_app.STYLESHEETS + [dash_app.PAGE_BACKGROUND]:
+        assert url in page
+        assert dashboard.get(url).status_code == 200
+    assert dashboard.get('/assets/vendor/font-awesome-5.15.4/webfonts/'
+                         'fa-solid-900.woff2').status_code == 200
@@ -0,0 +1,25 @@
+import gzip
+
+from flask import Flask, jsonify
+
+import compression
+
+
+def test_gzip_compression():
+    """Test 1: Verify large responses are gzipped only when accepted"""
+    server = Flask(__name__)
+    compression.enable_compression(server)
+    server.add_url_rule('/big', 'big', lambda: jsonify(values=list(range(500))))
+    client = server.test_client()
+
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'"values"' in gzip.decompress(response.data)
+
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in response.headers
+
+    # A malformed q-value makes the entry unacceptable, not the request fail
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip;q=x'})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
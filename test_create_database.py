@@ -0,0 +1,173 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from conftest import create_db
+
+
+def read_metric(db_path, metric):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT Value FROM TrendMetrics WHERE Metric = ? '
+                        'ORDER BY PeriodID', (metric,)).fetchall()
+    conn.close()
+    return [value for (value,) in rows]
+
+
+def test_trend_metrics_materialized(database):
+    """Test 1: Verify every trend metric is precomputed at build time"""
+    assert read_metric(database, 'gender_gap') == pytest.approx([0.7, 0.4, 0.4])
+    assert read_metric(database, 'london_national') == pytest.approx([0.6, 0.45, 0.65])
+    assert read_metric(database, 'regional_var') == pytest.approx(
+        [0.8485281, 0.6363961, 0.9192388])
+
+
+def test_incremental_update(database, tmp_path):
+    """Test 2: Verify --incremental loads new periods and refreshes metrics"""
+    with open(tmp_path / 'q2_region.csv', 'a') as f:
+        f.write('Jan 2024-Dec 2024,4.0,6.0\n')
+    assert create_db.can_update_in_place()
+    assert create_db.update_database()
+    assert read_metric(database, 'london_national')[-1] == pytest.approx(1.0)
+
+    conn = sqlite3.connect(database)
+    assert conn.execute('SELECT COUNT(*) FROM UnemploymentRateByRegion').fetchone()[0] == 8
+    conn.close()
+
+
+def test_incremental_skips_unchanged_files(database, capsys):
+    """Test 3: Verify unchanged CSVs are not reloaded"""
+    assert create_db.update_database()
+    out = capsys.readouterr().out
+    assert 'q1_gender.csv unchanged' in out
+    assert 'q2_region.csv unchanged' in out
+
+
+def test_breakdown_data_imported(database):
+    """Test 4: Verify long-format breakdowns load with confidence intervals"""
+    conn = sqlite3.connect(database)
+    rows = conn.execute('''
+        SELECT b.Dimension, b.Category, r.RegionName, ub.Rate, ub.ConfidenceInterval
+        FROM UnemploymentRateByBreakdown ub
+        JOIN Breakdown b ON ub.BreakdownID = b.BreakdownID
+        JOIN Region r ON ub.RegionID = r.RegionID
+        ORDER BY ub.PeriodID, ub.BreakdownID, ub.RegionID
+    ''').fetchall()
+    conn.close()
+    assert len(rows) == 5
+    assert rows[3] == ('Disability', 'not disabled', 'LDN', 4.6, None)
+    assert rows[4] == ('Ethnicity', 'White', 'UK', 3.2, 0.1)
+
+
+def test_fact_rows_in_period_order():
+    """Test 5: Verify wide CSV rows become fact rows in period, then column order"""
+    df = pd.DataFrame({'time': ['Jan 2022-Dec 2022', 'Jan 2023-Dec 2023'],
+                       'UK': [3.5, 3.7], 'LDN': [4.4, 5.0]})
+    rows = create_db.fact_rows(df, {'Jan 2022-Dec 2022': 7, 'Jan 2023-Dec 2023': 8},
+                               {'UK': 1, 'LDN': 2})
+    assert rows == [(7, 1, 3.5), (7, 2, 4.4), (8, 1, 3.7), (8, 2, 5.0)]
+
+
+def test_fast_build_loads_the_same_rows(database, tmp_path, capsys):
+    """Test 6: Verify --fast-build relaxes durability and loads identical rows"""
+    conn = sqlite3.connect(database)
+    before = conn.execute('SELECT PeriodID, RegionID, Rate FROM UnemploymentRateByRegion '
+                          'ORDER BY PeriodID, RegionID').fetchall()
+    conn.close()
+    capsys.readouterr()
+
+    assert create_db.rebuild_database(fast_build=True)
+    assert 'rows/sec' in capsys.readouterr().out
+    conn = sqlite3.connect(database)
+    assert conn.execute('SELECT PeriodID, RegionID, Rate FROM UnemploymentRateByRegion '
+                        'ORDER BY PeriodID, RegionID').fetchall() == before
+    conn.close()
+
+    conn = sqlite3.connect(tmp_path / 'fast.db')
+    create_db.set_build_pragmas(conn)
+    assert conn.execute('PRAGMA synchronous').fetchone()[0] == 0
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'memory'
+    conn.close()
+
+
+def test_failed_rebuild_keeps_live_database(database, tmp_path):
+    """Test 7: Verify a failed rebuild leaves the database as it was and no .tmp file"""
+    with open(database, 'rb') as f:
+        before = f.read()
+    (tmp_path / 'q3_breakdown.csv').write_text('time,rate\nJan 2023-Dec 2023,4.0\n')
+
+    assert not create_db.rebuild_database(validate=False)
+    with open(database, 'rb') as f:
+        assert f.read() == before
+    assert not (tmp_path / 'unemployment.db.tmp').exists()
+
+
+def test_update_rewrites_only_changed_rows(database, tmp_path, capsys):
+    """Test 8: Verify an incremental update rewrites only the rates that changed"""
+    csv = tmp_path / 'q2_region.csv'
+    csv.write_text(csv.read_text().replace('3.7,5.0', '3.7,5.5'))
+    capsys.readouterr()
+
+    assert create_db.update_database()
+    out = capsys.readouterr().out
+    assert 'q2_region.csv unchanged' not in out
+    assert '6 rows into UnemploymentRateByRegion' in out and '1 changed)' in out
+
+
+def test_rebuild_swaps_in_a_new_file(database, tmp_path):
+    """Test 9: Verify a rebuild replaces the file while open readers keep the old one"""
+    reader = sqlite3.connect(database)
+    query = 'SELECT MAX(Rate) FROM UnemploymentRateByRegion'
+    csv = tmp_path / 'q2_region.csv'
+    csv.write_text(csv.read_text().replace('3.7,5.0', '3.7,6.0'))
+
+    assert create_db.rebuild_database()
+    assert reader.execute(query).fetchone()[0] == pytest.approx(5.6)
+    reader.close()
+    conn = sqlite3.connect(database)
+    assert conn.execute(query).fetchone()[0] == pytest.approx(6.0)
+    conn.close()
+
+
+def test_rebuild_error_removes_temp_file(database, tmp_path, monkeypatch):
+    """Test 10: Verify a rebuild that raises closes and removes its .tmp file"""
+    with open(database, 'rb') as f:
+        before = f.read()
+
+    def fail(conn):
+        raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(create_db, 'build_trend_metrics', fail)
+    with pytest.raises(sqlite3.OperationalError):
+        create_db.rebuild_database()
+    with open(database, 'rb') as f:
+        assert f.read() == before
+    assert not (tmp_path / 'unemployment.db.tmp').exists()
+
+
+def test_incremental_rejects_earlier_period(database, tmp_path, capsys):
+    """Test 11: Verify --incremental refuses a period before those already loaded"""
+    csv = tmp_path / 'q2_region.csv'
+    csv.write_text(csv.read_text() + 'Jan 2020-Dec 2020,4.5,5.5\n')
+
+    assert not create_db.update_database(validate=False)
+    assert 'not after the periods already loaded' in capsys.readouterr().out
+    conn = sqlite3.connect(database)
+    assert conn.execute("SELECT COUNT(*) FROM TimePeriod "
+                        "WHERE PeriodName = 'Jan 2020-Dec 2020'").fetchone()[0] == 0
+    conn.close()
+
+    assert create_db.rebuild_database(validate=False)
+    conn = sqlite3.connect(database)
+    periods = [name for (name,) in conn.execute(
+        'SELECT PeriodName FROM TimePeriod ORDER BY PeriodID')]
+    conn.close()
+    assert periods[0] == 'Jan 2020-Dec 2020'
+
+
+def test_failed_build_exits_non_zero(database, tmp_path):
+    """Test 12: Verify the command line exits 1 when validation fails"""
+    csv = tmp_path / 'q2_region.csv'
+    csv.write_text(csv.read_text().replace('5.6', '560.0'))
+    assert create_db.main([]) == 1
+    assert create_db.main(['--skip-validation']) == 0
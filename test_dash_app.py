@@ -1,4 +1,15 @@
+import os
+
 import pytest
+
+# Browser checks need Chrome, a ChromeDriver download and a live server on
+# localhost:8050; test_callbacks.py covers the same ground headlessly
+if os.environ.get('DASH_BROWSER_TESTS') != '1':
+    pytest.skip('set DASH_BROWSER_TESTS=1 to run the browser tests',
+                allow_module_level=True)
+pytest.importorskip('selenium')
+pytest.importorskip('webdriver_manager')
+
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+
+import pandas as pd
+
+import charts
+import dashboard_data
+import data_access
+import snapshot_file
+from conftest import create_db
+
+
+def make_frames():
+    """Build small frames shaped like data_access.fetch_dashboard_frame()
+    and data_access.fetch_gender_rates()"""
+    regions = pd.DataFrame([
+        ('P1', 'UK', 4.0),
+        ('P1', 'LDN', 6.0),
+        ('P2', 'UK', 5.0),
+        ('P2', 'LDN', 8.0),
+    ], columns=['PeriodName', 'RegionName', 'Rate'])
+    gender = pd.DataFrame([
+        (2004, 7.0, 6.5),
+        (2005, 6.0, 6.5),
+    ], columns=['year', 'male', 'female'])
+    return regions, gender
+
+
+def test_derive_series():
+    """Test 1: Verify every chart series is derived from the query frames"""
+    data = dashboard_data.derive_series(*make_frames())
+    assert data.gender.to_dict('list') == {
+        'year': [2004, 2005], 'male': [7.0, 6.0], 'female': [6.5, 6.5]}
+    assert data.london['Rate'].tolist() == [6.0, 8.0]
+    assert data.regional['RegionName'].tolist() == ['UK', 'LDN', 'UK', 'LDN']
+
+
+def test_store_reloads_only_on_version_change():
+    """Test 2: Verify reads share one load until the database version changes"""
+    version = [1]
+    calls = []
+
+    def load():
+        calls.append(1)
+        return dashboard_data.derive_series(*make_frames())
+
+    store = dashboard_data.DataStore(loader=load, version=lambda: version[0],
+                                     interval=0)
+    for _ in range(4):
+        store.get()
+    assert len(calls) == 1
+    version[0] = 2
+    assert store.get().version == 1
+    store.refresh()
+    assert len(calls) == 2
+    assert store.get().version == 2
+
+
+def test_failed_refresh_keeps_snapshot():
+    """Test 3: Verify a failing reload keeps serving the previous snapshot"""
+    version = [1]
+    failed = threading.Event()
+
+    def load():
+        if version[0] > 1:
+            failed.set()
+            raise RuntimeError('database is being rebuilt')
+        return dashboard_data.derive_series(*make_frames())
+
+    store = dashboard_data.DataStore(loader=load, version=lambda: version[0],
+                                     interval=0.01)
+    first = store.get()
+    version[0] = 2
+    assert failed.wait(5)
+    store.stop()
+    assert store.get() is first
+
+
+def test_snapshot_file_matches_database(database):
+    """Test 4: Verify the mapped snapshot holds the same rows as SQLite"""
+    data_access.configure(database)
+    try:
+        frames = snapshot_file.read_snapshot()
+        assert frames is not None
+        for name, query in data_access.QUERIES.items():
+            pd.testing.assert_frame_equal(frames[name],
+                                          data_access.read_sql(query))
+
+        # Any write to the database makes the snapshot stale
+        conn = sqlite3.connect(database)
+        conn.execute('UPDATE UnemploymentRateByRegion SET Rate = Rate + 1')
+        conn.commit()
+        conn.close()
+        assert snapshot_file.read_snapshot() is None
+    finally:
+        data_access.configure()
+
+
+def test_store_without_gender_rows():
+    """Test 5: Verify charts render empty for metrics the database could not materialize"""
+    regions, gender = make_frames()
+    trends = pd.DataFrame([
+        ('london_national', 'P1', 1.0),
+        ('london_national', 'P2', 1.5),
+    ], columns=['Metric', 'PeriodName', 'Value'])
+    store = dashboard_data.DataStore(
+        loader=lambda: dashboard_data.derive_series(regions, gender.iloc[:0],
+                                                    trends),
+        version=lambda: 'no-gender', interval=0)
+    figures = charts.render_variants(store.get(), 'trend')
+    assert figures['gender_gap']['data'] == []
+    assert len(figures['london_national']['data']) == 1
+    assert charts.render(store.get(), 'disability', 'LDN')['data'] == []
+
+
+def test_snapshot_rejected_after_same_size_rebuild(database, tmp_path):
+    """Test 6: Verify a rebuild changing only a rate invalidates the old snapshot"""
+    path = snapshot_file.snapshot_path(database)
+    with open(path, 'rb') as f:
+        old = f.read()
+    csv = tmp_path / 'q2_region.csv'
+    csv.write_text(csv.read_text().replace('5.6', '9.9'))
+    assert create_db.rebuild_database()
+
+    frames = snapshot_file.read_snapshot(db_path=database)
+    assert 9.9 in frames['dashboard']['Rate'].tolist()
+    with open(path, 'wb') as f:
+        f.write(old)
+    assert snapshot_file.read_snapshot(db_path=database) is None
+
+
+def test_truncated_snapshot_ignored(database):
+    """Test 7: Verify a truncated or corrupt snapshot falls back to SQLite"""
+    path = snapshot_file.snapshot_path(database)
+    with open(path, 'rb') as f:
+        data = f.read()
+    for broken in (data[:2000], data[:len(data) // 2 + 1000], data[:12]):
+        with open(path, 'wb') as f:
+            f.write(broken)
+        assert snapshot_file.read_snapshot(db_path=database) is None
@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+
+import pytest
+
+import data_access
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Fixture providing a pool over a small throwaway database"""
+    db_path = tmp_path / 'test.db'
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.executemany('INSERT INTO t VALUES (?)', [(1,), (2,), (3,)])
+    conn.commit()
+    conn.close()
+    pool = data_access.configure(str(db_path), size=2)
+    yield pool
+    pool.close_all()
+    data_access.configure()
+
+
+def test_read_sql_returns_dataframe(pool):
+    """Test 1: Verify queries run through the pool return a DataFrame"""
+    df = data_access.read_sql('SELECT x FROM t WHERE x > ? ORDER BY x', (1,))
+    assert df['x'].tolist() == [2, 3]
+
+
+def test_connections_are_read_only(pool):
+    """Test 2: Verify pooled connections reject writes"""
+    with pool.connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute('INSERT INTO t VALUES (4)')
+
+
+def test_connections_are_reused(pool):
+    """Test 3: Verify a released connection is handed out again"""
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+
+
+def test_pool_is_bounded_across_threads(pool):
+    """Test 4: Verify concurrent readers never open more than the pool size"""
+    opened = set()
+
+    def worker():
+        for _ in range(20):
+            with pool.connection() as conn:
+                opened.add(id(conn))
+                conn.execute('SELECT COUNT(*) FROM t').fetchone()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(opened) <= 2
+
+
+def test_schema_check(pool, database):
+    """Test 5: Verify the startup check rejects a database without the schema"""
+    with pytest.raises(data_access.SchemaError, match='GenderRate'):
+        data_access.check_schema()
+    data_access.configure(database)
+    data_access.check_schema()
+    data_access.configure('missing.db')
+    with pytest.raises(data_access.SchemaError, match='does not exist'):
+        data_access.check_schema()
+
+
+def test_modified_time(pool):
+    """Test 6: Verify the modification time is read from a database version"""
+    version = data_access.database_version()
+    assert data_access.modified_time(version) == version.mtime_ns / 1e9
+    assert data_access.database_version('missing.db') is None
+    assert data_access.modified_time(None) is None
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import extract
+
+NAN = np.nan
+
+
+def make_grid():
+    """Build a raw sheet grid with a UK block, a London block and a footnote"""
+    return pd.DataFrame([
+        ['United Kingdom', 'Rate A', NAN, NAN, 'Rate B', NAN],
+        [NAN, 'numerator', 'percent', NAN, 'numerator', 'percent'],
+        ['Jan 2022-Dec 2022', 100, 4.5, NAN, 50, '-'],
+        ['Jan 2023-Dec 2023', 110, 5, NAN, 55, 3.5],
+        [NAN, NAN, NAN, NAN, NAN, NAN],
+        ['London', 'Rate A', NAN, NAN, 'Rate B', NAN],
+        [NAN, 'numerator', 'percent', NAN, 'numerator', 'percent'],
+        ['Jan 2022-Dec 2022', 10, 6.5, NAN, 5, 7.0],
+        [NAN, NAN, NAN, NAN, NAN, NAN],
+        ['* footnote', NAN, NAN, NAN, NAN, NAN],
+    ], dtype=object)
+
+
+def test_split_blocks():
+    """Test 1: Verify stacked blocks are split and parsed like read_excel"""
+    uk, ldn = extract.split_blocks(make_grid())
+    assert uk.columns.names == ['United Kingdom', None]
+    assert list(uk.columns) == [('Rate A', 'numerator'), ('Rate A', 'percent'),
+                                ('Rate B', 'numerator'), ('Rate B', 'percent')]
+    assert uk[('Rate A', 'numerator')].dtype == np.int64
+    assert uk[('Rate A', 'percent')].tolist() == [4.5, 5.0]
+    assert uk[('Rate B', 'percent')].tolist() == ['-', 3.5]
+    assert ldn.columns.names == ['London', None]
+    # Footnotes stay attached to the last block, as with skiprows
+    assert ldn.index[-1] == '* footnote'
+
+
+def test_cells_round_trip():
+    """Test 2: Verify the cached long format rebuilds identical grids"""
+    grids = {'Gender': make_grid()}
+    rebuilt = extract.cells_to_grids(extract.grids_to_cells(grids))
+    for original, restored in zip(extract.split_blocks(grids['Gender']),
+                                  extract.split_blocks(rebuilt['Gender'])):
+        pd.testing.assert_frame_equal(original, restored)
+
+
+def test_cache_skips_workbook_parse(tmp_path, monkeypatch):
+    """Test 3: Verify a second load reads the cache instead of the workbook"""
+    pytest.importorskip('pyarrow')
+    workbook = tmp_path / 'book.xlsx'
+    workbook.write_bytes(b'not really a workbook')
+    calls = []
+
+    def fake_read(path, sheets):
+        calls.append(path)
+        return {'Gender': make_grid()}
+
+    monkeypatch.setattr(extract, 'read_sheet_grids', fake_read)
+    first = extract.extract_workbook(str(workbook), ('Gender',), str(tmp_path / 'cache'))
+    second = extract.extract_workbook(str(workbook), ('Gender',), str(tmp_path / 'cache'))
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first['Gender'][0], second['Gender'][0])
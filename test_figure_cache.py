@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from figure_cache import FigureCache, figure_cache
+
+
+def test_lru_eviction():
+    """Test 1: Verify the least recently used entry is evicted first"""
+    cache = FigureCache(maxsize=2)
+    cache.put('a', 1, {'a': 1})
+    cache.put('b', 1, {'b': 1})
+    cache.get('a', 1)
+    cache.put('c', 1, {'c': 1})
+    assert cache.get('a', 1) == {'a': 1}
+    assert cache.get('b', 1) is None
+    assert len(cache) == 2
+
+
+def test_version_change_invalidates():
+    """Test 2: Verify entries from an older database version are dropped"""
+    cache = FigureCache()
+    cache.put('a', 1, {'a': 1})
+    assert cache.get('a', 2) is None
+    assert len(cache) == 0
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork()')
+def test_forked_child_gets_a_free_lock():
+    """Test 3: Verify a child forked while the cache is locked can still lock it"""
+    with figure_cache._lock:
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if figure_cache._lock.acquire(timeout=5) else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,28 @@
+import numpy as np
+
+from figures import downsample, lttb_indices, line_trace
+
+
+def test_lttb_keeps_extremes():
+    """Test 1: Verify LTTB keeps both ends and the series' peaks"""
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    y[500] = 10.0
+    kept = lttb_indices(x, y, 100)
+    assert len(kept) == 100
+    assert kept[0] == 0 and kept[-1] == 999
+    assert 500 in kept
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_trace_downsampled_to_budget():
+    """Test 2: Verify long traces are cut to the budget as typed arrays"""
+    periods = [f'P{i}' for i in range(50)]
+    x, y, error = downsample(periods, np.arange(50.0), np.ones(50),
+                             max_points=10)
+    assert len(x) == len(y) == len(error) == 10
+    assert x[0] == 'P0' and x[-1] == 'P49'
+
+    trace = line_trace(periods[:5], np.arange(5.0), name='short').to_plotly_json()
+    assert list(trace['x']) == periods[:5]
+    assert isinstance(trace['y'], np.ndarray)
@@ -0,0 +1,85 @@
+from flask import Flask, jsonify
+
+import http_cache
+
+
+def make_server(version):
+    """Flask app with a fake callback endpoint counting its calls"""
+    server = Flask(__name__)
+    calls = []
+
+    def update():
+        calls.append(1)
+        return jsonify(response={'figure': {}})
+
+    server.add_url_rule(http_cache.UPDATE_PATH, 'update', update,
+                        methods=['POST'])
+    server.add_url_rule('/layout', 'layout', lambda: jsonify(layout=[]))
+    http_cache.enable_http_caching(server, lambda: version[0], salt='test',
+                                   last_modified=lambda: 0)
+    return server.test_client(), calls
+
+
+def test_callback_304_skips_callback():
+    """Test 1: Verify a matching If-None-Match gets a 304 without the callback"""
+    version = [1]
+    client, calls = make_server(version)
+    body = {'output': 'chart.figure'}
+    first = client.post(http_cache.UPDATE_PATH, json=body)
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+    assert first.headers['Last-Modified']
+
+    again = client.post(http_cache.UPDATE_PATH, json=body,
+                        headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert len(calls) == 1
+
+    version[0] = 2
+    changed = client.post(http_cache.UPDATE_PATH, json=body,
+                          headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert len(calls) == 2
+
+    # The query string is part of the request, so it is part of the ETag
+    other = client.post(http_cache.UPDATE_PATH + '?endId=x', json=body,
+                        headers={'If-None-Match': changed.headers['ETag']})
+    assert other.status_code == 200
+    assert other.headers['ETag'] != changed.headers['ETag']
+
+    # Background job polls are answered fresh every time
+    poll = client.post(http_cache.UPDATE_PATH + '?cacheKey=k&job=1', json=body)
+    assert 'ETag' not in poll.headers
+
+
+def test_json_conditional_get():
+    """Test 2: Verify layout JSON is revalidated with a content ETag"""
+    client, _ = make_server([1])
+    first = client.get('/layout')
+    assert first.headers['Cache-Control'] == 'no-cache'
+    again = client.get('/layout', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_asset_cache_control():
+    """Test 3: Verify fingerprinted and vendored assets are cached for a year"""
+    year = http_cache.asset_cache_control('/assets/dashboard.css', {'m': '1'})
+    assert 'max-age=31536000' in year and 'immutable' in year
+    vendored = http_cache.asset_cache_control(
+        '/assets/vendor/bootstrap-5.1.3/bootstrap.min.css', {})
+    assert 'immutable' in vendored
+    assert http_cache.asset_cache_control('/assets/logo.png', {}) == (
+        'public, max-age=86400')
+
+
+def test_unknown_modification_time():
+    """Test 4: Verify no Last-Modified is sent when the data's age is unknown"""
+    server = Flask(__name__)
+    server.add_url_rule(http_cache.UPDATE_PATH, 'update',
+                        lambda: jsonify(response={}), methods=['POST'])
+    http_cache.enable_http_caching(server, lambda: None,
+                                   last_modified=lambda: None)
+    response = server.test_client().post(http_cache.UPDATE_PATH, json={})
+    assert response.headers['ETag']
+    assert 'Last-Modified' not in response.headers
@@ -0,0 +1,166 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ingest
+from conftest import create_db
+
+NAN = np.nan
+PERIODS = ['Jan 2022-Dec 2022', 'Jan 2023-Dec 2023']
+CATEGORIES = {
+    'Gender': ['Unemployment rate - aged 16+',
+               'Unemployment rate males - aged 16+',
+               'Unemployment rate females - aged 16+'],
+    'Disability': ['Unemployment rate aged 16-64 - disabled'],
+    'Ethnicity': ['16+ unemployment rate - White'],
+}
+
+
+def make_grid(region, categories, rate):
+    """Build a raw sheet grid with a UK block and a block for region"""
+    rows = []
+    for title, offset in (('United Kingdom', 0.0), (region, rate)):
+        if rows:
+            rows.append([NAN] * (1 + 2 * len(categories)))
+        rows.append([title] + [c for category in categories
+                               for c in (category, NAN)])
+        rows.append([NAN] + ['percent', 'conf'] * len(categories))
+        for i, period in enumerate(PERIODS):
+            rows.append([period] + [4.0 + offset + i, 0.2] * len(categories))
+    return pd.DataFrame(rows, dtype=object)
+
+
+def write_workbook(path, region, rate):
+    """Write a regional workbook laid out like the published one"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with pd.ExcelWriter(path) as writer:
+        for sheet, categories in CATEGORIES.items():
+            make_grid(region, categories, rate).to_excel(
+                writer, sheet_name=sheet, header=False, index=False)
+
+
+@pytest.fixture
+def workbooks(tmp_path, monkeypatch):
+    """Fixture writing a London and a North East workbook to workbooks/"""
+    pytest.importorskip('openpyxl')
+    monkeypatch.chdir(tmp_path)
+    write_workbook('workbooks/london.xlsx', 'London', 1.0)
+    write_workbook('workbooks/2024/north-east.xlsx', 'North East', 2.0)
+    (tmp_path / 'workbooks' / '~$london.xlsx').write_bytes(b'lock file')
+    return str(tmp_path / 'workbooks')
+
+
+def read_rates(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('''
+        SELECT r.RegionName, tp.PeriodName, ur.Rate
+        FROM UnemploymentRateByRegion ur
+        JOIN Region r ON ur.RegionID = r.RegionID
+        JOIN TimePeriod tp ON ur.PeriodID = tp.PeriodID
+        ORDER BY r.RegionID, ur.PeriodID
+    ''').fetchall()
+    conn.close()
+    return rows
+
+
+def read_metric(metric):
+    conn = sqlite3.connect('unemployment.db')
+    rows = conn.execute('SELECT Value FROM TrendMetrics WHERE Metric = ? '
+                        'ORDER BY PeriodID', (metric,)).fetchall()
+    conn.close()
+    return [value for (value,) in rows]
+
+
+def test_parallel_build_merges_workbooks(workbooks):
+    """Test 1: Verify workbooks parsed in a pool are merged into one database"""
+    assert [workbook.name for workbook in ingest.discover([workbooks])] \
+        == ['2024/north-east.xlsx', 'london.xlsx']
+    assert create_db.rebuild_database(workbooks=[workbooks], workers=2)
+
+    # The UK block both workbooks carry is loaded once
+    assert read_rates('unemployment.db') == [
+        ('UK', PERIODS[0], 4.0), ('UK', PERIODS[1], 5.0),
+        ('LDN', PERIODS[0], 5.0), ('LDN', PERIODS[1], 6.0),
+        ('North East', PERIODS[0], 6.0), ('North East', PERIODS[1], 7.0),
+    ]
+    conn = sqlite3.connect('unemployment.db')
+    assert conn.execute('SELECT COUNT(*) FROM UnemploymentRateByGender').fetchone()[0] == 4
+    assert conn.execute('SELECT COUNT(*) FROM UnemploymentRateByBreakdown').fetchone()[0] == 12
+    assert sorted(name for (name,) in conn.execute('SELECT FileName FROM SourceFile')) \
+        == ['2024/north-east.xlsx', 'london.xlsx']
+    conn.close()
+
+
+def test_incremental_skips_unchanged_workbooks(workbooks, capsys):
+    """Test 2: Verify only workbooks whose content changed are parsed again"""
+    assert create_db.rebuild_database(workbooks=[workbooks])
+    write_workbook(os.path.join(workbooks, 'london.xlsx'), 'London', 1.5)
+    capsys.readouterr()
+
+    assert create_db.update_database(workbooks=[workbooks])
+    out = capsys.readouterr().out
+    assert 'north-east.xlsx: skipped (unchanged)' in out
+    assert 'london.xlsx: parsed' in out
+    assert ('LDN', PERIODS[1], 6.5) in read_rates('unemployment.db')
+
+
+def test_invalid_workbook_loads_nothing(workbooks):
+    """Test 3: Verify one workbook failing validation leaves the database unchanged"""
+    assert create_db.rebuild_database(workbooks=[workbooks])
+    before = read_rates('unemployment.db')
+    write_workbook(os.path.join(workbooks, 'london.xlsx'), 'London', 150.0)
+
+    assert not create_db.update_database(workbooks=[workbooks],
+                                         report_path='report.json')
+    assert read_rates('unemployment.db') == before
+    results = ingest.parse_workbooks(ingest.discover([workbooks]))
+    assert [result.status for result in results] == ['parsed', 'invalid']
+    assert os.path.exists('report.json')
+
+
+def test_releases_with_the_same_file_name(workbooks, capsys):
+    """Test 4: Verify same-named workbooks in release folders are tracked apart"""
+    os.remove(os.path.join(workbooks, 'london.xlsx'))
+    write_workbook(os.path.join(workbooks, '2024', 'london.xlsx'), 'London', 1.0)
+    write_workbook(os.path.join(workbooks, '2025', 'london.xlsx'), 'London', 3.0)
+    assert create_db.rebuild_database(workbooks=[workbooks])
+    # The 2025 release sorts last, so its London rates win
+    assert ('LDN', PERIODS[0], 7.0) in read_rates('unemployment.db')
+    capsys.readouterr()
+
+    assert create_db.update_database(workbooks=[workbooks])
+    out = capsys.readouterr().out
+    assert 'parsed (' not in out
+    assert ('LDN', PERIODS[0], 7.0) in read_rates('unemployment.db')
+    conn = sqlite3.connect('unemployment.db')
+    assert sorted(name for (name,) in conn.execute('SELECT FileName FROM SourceFile')) \
+        == ['2024/london.xlsx', '2024/north-east.xlsx', '2025/london.xlsx']
+    conn.close()
+
+
+def test_trend_metrics_cover_every_region(workbooks):
+    """Test 5: Verify regional metrics span every region the workbooks load"""
+    assert create_db.rebuild_database(workbooks=[workbooks])
+    # UK, London and the North East are 0, 1 and 2 points apart
+    assert read_metric('london_national') == pytest.approx([0.0, 0.0])
+    assert read_metric('regional_var') == pytest.approx([1.0, 1.0])
+
+
+def test_incremental_keeps_later_release(workbooks, capsys):
+    """Test 6: Verify changing an older release does not override a later one"""
+    os.remove(os.path.join(workbooks, 'london.xlsx'))
+    write_workbook(os.path.join(workbooks, '2024', 'london.xlsx'), 'London', 1.0)
+    write_workbook(os.path.join(workbooks, '2025', 'london.xlsx'), 'London', 3.0)
+    assert create_db.rebuild_database(workbooks=[workbooks])
+    before = read_rates('unemployment.db')
+    write_workbook(os.path.join(workbooks, '2024', 'london.xlsx'), 'London', 1.5)
+    capsys.readouterr()
+
+    assert create_db.update_database(workbooks=[workbooks])
+    out = capsys.readouterr().out
+    assert '2025/london.xlsx: parsed' in out
+    # The 2025 release still sorts last, so its London rates are kept
+    assert read_rates('unemployment.db') == before
@@ -0,0 +1,71 @@
+import logging
+
+from flask import Flask
+
+import dashboard_data
+import metrics
+
+
+def test_histogram_exposition():
+    """Test 1: Verify histograms render cumulative Prometheus buckets"""
+    histogram = metrics.Histogram('demo_seconds', 'Demo', ['callback'],
+                                  buckets=(0.1, 1.0))
+    histogram.observe(0.05, 'gender')
+    histogram.observe(0.5, 'gender')
+    text = metrics.render([histogram])
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{callback="gender",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{callback="gender",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{callback="gender",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{callback="gender"} 2' in text
+
+
+def test_phases_are_exclusive(monkeypatch, caplog):
+    """Test 2: Verify nested phases and SQL are timed and logged when slow"""
+    monkeypatch.setattr(metrics, 'SLOW_CALLBACK_MS', 1e-9)
+    traces = []
+
+    @metrics.instrumented('test_phases')
+    def callback():
+        with metrics.phase('figure'):
+            with metrics.timed_query('SELECT 1'):
+                pass
+            traces.append(metrics.current_trace())
+
+    with caplog.at_level(logging.WARNING, logger='metrics'):
+        callback()
+    trace = traces[0]
+    assert set(trace.phases) == {'figure', 'sql'}
+    assert trace.queries[0][0] == 'SELECT 1'
+    assert metrics.callback_calls.value('test_phases') == 1
+    assert metrics.phase_seconds.count('test_phases', 'sql') == 1
+    assert metrics.current_trace() is None
+    assert 'Slow callback test_phases' in caplog.text
+    assert 'SELECT 1' in caplog.text
+
+
+def test_metrics_route():
+    """Test 3: Verify the /metrics route serves the text exposition format"""
+    server = Flask(__name__)
+    metrics.register(server)
+    response = server.test_client().get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert b'# TYPE dash_callback_duration_seconds histogram' in response.data
+
+
+def test_data_load_traced():
+    """Test 4: Verify a store load outside any callback reaches the metrics"""
+    def load():
+        with metrics.phase('snapshot'):
+            pass
+        with metrics.phase('transform'):
+            return 'data'
+
+    calls = metrics.callback_calls.value('data_load')
+    store = dashboard_data.DataStore(loader=load, version=lambda: 1,
+                                     interval=0)
+    assert store.refresh().data == 'data'
+    assert metrics.callback_calls.value('data_load') == calls + 1
+    assert metrics.phase_seconds.count('data_load', 'snapshot') >= 1
+    assert metrics.phase_seconds.count('data_load', 'transform') >= 1
@@ -0,0 +1,88 @@
+import sqlite3
+
+import pytest
+
+import data_access
+
+FACT_TABLES = {'UnemploymentRateByGender', 'UnemploymentRateByRegion',
+               'UnemploymentRateByBreakdown'}
+
+DASHBOARD_QUERIES = data_access.QUERIES
+
+# Fact table B-tree each query reads its rates from. The fact tables are
+# WITHOUT ROWID, so the B-tree named after the table is its primary key with
+# the rates stored inline.
+FACT_BTREES = {
+    'dashboard': {'UnemploymentRateByRegion'},
+    'gender': {'UnemploymentRateByGender'},
+    'breakdowns': {'UnemploymentRateByBreakdown'},
+}
+
+
+def query_plan(db_path, query):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + query)]
+    finally:
+        conn.close()
+
+
+def opened_btrees(db_path, query):
+    """Return the table and index B-trees a query's bytecode opens, by table"""
+    conn = sqlite3.connect(db_path)
+    try:
+        roots = {rootpage: (table, name) for name, table, rootpage in
+                 conn.execute('SELECT name, tbl_name, rootpage FROM sqlite_master')}
+        opened = {}
+        for row in conn.execute('EXPLAIN ' + query):
+            if row[1] == 'OpenRead':
+                table, name = roots[row[3]]
+                opened.setdefault(table, set()).add(name)
+        return opened
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('name', sorted(DASHBOARD_QUERIES))
+def test_no_sorts(database, name):
+    """Verify dashboard queries read rows in the order they return them"""
+    plan = query_plan(database, DASHBOARD_QUERIES[name])
+    assert not any('TEMP B-TREE' in step for step in plan), plan
+
+
+@pytest.mark.parametrize('name', sorted(FACT_BTREES))
+def test_fact_tables_read_from_primary_keys(database, name):
+    """Verify dashboard queries read fact tables from their clustered primary keys"""
+    opened = opened_btrees(database, DASHBOARD_QUERIES[name])
+    fact_btrees = set().union(*(names for table, names in opened.items()
+                                if table in FACT_TABLES))
+    assert fact_btrees == FACT_BTREES[name], opened
+
+
+def test_fact_tables_have_no_secondary_indexes(database):
+    """Verify no index duplicates a fact table's primary key"""
+    conn = sqlite3.connect(database)
+    indexes = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' "
+                           "AND tbl_name IN (?, ?, ?)", sorted(FACT_TABLES)).fetchall()
+    without_rowid = {name for name, in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE '%WITHOUT ROWID%'")}
+    conn.close()
+    assert indexes == []
+    assert FACT_TABLES <= without_rowid
+
+
+def test_fact_rows_are_unique(database):
+    """Verify a period cannot hold two rates for the same region"""
+    conn = sqlite3.connect(database)
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute('INSERT INTO UnemploymentRateByRegion (PeriodID, RegionID, Rate) '
+                     'VALUES (1, 1, 0.0)')
+    conn.close()
+
+
+def test_build_runs_analyze(database):
+    """Verify the build leaves planner statistics behind"""
+    conn = sqlite3.connect(database)
+    stats = {row[1] for row in conn.execute('SELECT tbl, idx FROM sqlite_stat1')}
+    conn.close()
+    assert FACT_TABLES <= stats
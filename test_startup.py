@@ -0,0 +1,23 @@
+import startup_profile
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:      2500 |       2620 |   charts
+import time:       900 |       3520 | dash_app
+"""
+
+
+def test_parse_importtime():
+    """Test 1: Verify -X importtime output is parsed per module"""
+    modules = startup_profile.parse_importtime(IMPORTTIME)
+    assert [m['module'] for m in modules] == ['_io', 'charts', 'dash_app']
+    assert modules[2] == {'module': 'dash_app', 'self_ms': 0.9,
+                          'cumulative_ms': 3.52, 'depth': 0}
+    assert modules[0]['depth'] == 2
+
+
+def test_startup_within_budget():
+    """Test 2: Verify the app imports without pandas and starts within budget"""
+    report = startup_profile.profile_startup()
+    assert report['deferred_imported'] == []
+    assert startup_profile.check_budget(report) == []
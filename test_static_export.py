@@ -0,0 +1,71 @@
+import json
+import shutil
+
+import charts
+import dashboard_data
+import data_access
+import static_export
+from conftest import create_db
+from test_callbacks import values
+
+
+def test_export_bundle(dashboard, tmp_path):
+    """Test 1: Verify every page and every dropdown value's figure is exported"""
+    output = tmp_path / 'static'
+    manifest = static_export.export(str(output))
+    expected = [static_export.figure_path(spec.key, value)
+                for spec in charts.CHARTS
+                for value in charts.control_values(spec)]
+    assert manifest['figures'] == expected
+    for path in expected:
+        figure = json.loads((output / path).read_text())
+        assert 'data' in figure and 'layout' in figure
+
+    trend = json.loads((output / 'figures/trend/gender_gap.json').read_text())
+    assert trend['data'][0]['name'] == 'Gender Gap'
+    page = (output / 'dashboard' / 'index.html').read_text()
+    assert page.count('class="chart"') == len(charts.CHARTS)
+    assert '<option value="regional_var">Regional Variance</option>' in page
+    assert (output / 'index.html').exists()
+    assert (output / 'assets' / 'plotly.min.js').exists()
+    assert 'href="../assets/vendor/bootstrap-5.1.3/bootstrap.min.css"' in page
+    assert (output / 'assets' / 'vendor' / 'background.svg').exists()
+
+
+def test_export_skipped_when_unchanged(dashboard, tmp_path):
+    """Test 2: Verify an unchanged database is not exported twice"""
+    output = str(tmp_path / 'static')
+    assert static_export.export(output) is not None
+    assert static_export.export(output) is None
+    assert static_export.export(output, force=True) is not None
+
+
+def test_export_redone_when_assets_change(dashboard, tmp_path, monkeypatch):
+    """Test 3: Verify editing a file under assets/ makes the bundle stale"""
+    assets = tmp_path / 'assets'
+    shutil.copytree(static_export.ASSETS_DIR, assets)
+    monkeypatch.setattr(static_export, 'ASSETS_DIR', str(assets))
+    output = str(tmp_path / 'static')
+    assert static_export.export(output) is not None
+    assert static_export.export(output) is None
+    with open(assets / 'dashboard.css', 'a') as f:
+        f.write('h1 { color: red; }\n')
+    assert static_export.export(output) is not None
+
+
+def test_export_after_rebuild(database, tmp_path, monkeypatch):
+    """Test 4: Verify a rebuild that changes one rate is exported again"""
+    monkeypatch.setattr(dashboard_data, 'store',
+                        dashboard_data.DataStore(interval=0))
+    data_access.configure(database)
+    try:
+        output = str(tmp_path / 'out')
+        assert static_export.export(output) is not None
+        csv = tmp_path / 'q2_region.csv'
+        csv.write_text(csv.read_text().replace('5.6', '9.9'))
+        assert create_db.rebuild_database()
+        assert static_export.export(output) is not None
+        london = json.loads((tmp_path / 'out' / 'figures' / 'london.json').read_text())
+        assert 9.9 in values(london['data'][0]['y'])
+    finally:
+        data_access.configure()
@@ -0,0 +1,51 @@
+import json
+import os
+
+import pandas as pd
+
+import validation
+from conftest import create_db
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=validation.COLUMNS)
+
+
+def test_rules_flag_bad_rows():
+    """Test 1: Verify each rule reports the rows that break it"""
+    report = validation.validate(frame([
+        ('Gender', 'LDN', 'male', 'Jan 2021-Dec 2021', 5.0, 0.5),
+        ('Gender', 'LDN', 'male', 'Jan 2020-Dec 2020', 120.0, -1.0),
+        ('Gender', 'LDN', 'male', 'Jan 2022-Dec 2022', None, None),
+        ('Gender', 'LDN', 'male', 'Jan 2023-Dec 2023', None, None),
+        ('Gender', 'UK', 'male', 'Jan 2021-Dec 2021', 25.0, 0.5),
+    ]))
+    failures = {check['rule']: check['failures']
+                for check in report['checks']}
+    assert failures == {'missing_values': 1, 'rate_range': 1,
+                        'monotonic_periods': 1, 'region_gap': 1,
+                        'region_coverage': 1}
+    assert not report['passed']
+    assert json.loads(validation.to_json(report))['rows'] == 5
+
+
+def test_warnings_do_not_fail(database):
+    """Test 2: Verify the fixture CSVs pass, with one-region series as warnings"""
+    report = validation.validate(validation.source_frame())
+    assert report['passed']
+    checks = {check['rule']: check for check in report['checks']}
+    assert checks['region_coverage']['failures'] > 0
+    assert checks['region_coverage']['severity'] == 'warning'
+
+
+def test_build_gate_keeps_database(database, tmp_path):
+    """Test 3: Verify a failing source leaves the built database untouched"""
+    before = os.stat(database).st_mtime_ns
+    with open(tmp_path / 'q2_region.csv', 'a') as f:
+        f.write('Jan 2024-Dec 2024,4.0,140.0\n')
+    report_path = tmp_path / 'report.json'
+    assert not create_db.rebuild_database(report_path=str(report_path))
+    assert not create_db.update_database()
+    assert os.stat(database).st_mtime_ns == before
+    report = json.loads(report_path.read_text())
+    assert not report['passed']
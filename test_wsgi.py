@@ -0,0 +1,22 @@
+import charts
+import dashboard_data
+from figure_cache import figure_cache
+
+
+def test_warm_up_renders_first_page_load(dashboard, monkeypatch):
+    """Test 1: Verify warm-up caches every figure the page asks for, without a poller"""
+    import wsgi
+
+    store = dashboard_data.DataStore(interval=60)
+    monkeypatch.setattr(dashboard_data, 'store', store)
+    figure_cache.clear()
+    wsgi.warm_up()
+    assert store._poller is None
+
+    version = store._snapshot.version
+    for spec in charts.CHARTS:
+        values = charts.control_values(spec)
+        if spec.client_side:
+            values = values + [None]
+        for value in values:
+            assert figure_cache.get(('chart', spec.key, value), version) is not None
@@ -0,0 +1,234 @@
+"""Declarative data-quality rules for the unemployment data.
+
+Every source, whether the workbook's sheets or the CSVs the database is built
+from, is reshaped into one long frame with a row per dimension, region,
+category and period. Each rule in :data:`RULES` is then a few vectorized
+pandas operations over that frame, so all sheets are checked at once and
+the cost grows with the number of values rather than the number of frames.
+
+Run directly to check the workbook and print the JSON report::
+
+    python validation.py [--output data_quality.json]
+"""
+import argparse
+import json
+import os
+import sys
+from collections import namedtuple
+
+import pandas as pd
+
+from extract import (REGION_CODES, SHEETS, WORKBOOK, breakdown_rows,
+                     extract_workbook)
+
+# Columns of the long frame every rule runs on
+COLUMNS = ['dimension', 'region', 'category', 'time', 'rate', 'conf']
+# One time series: the rows sharing these columns, in period order
+SERIES = ['dimension', 'region', 'category']
+
+# Most missing rates a series may have, as a fraction of its periods
+MAX_MISSING = 0.2
+# Unemployment rates are percentages
+RATE_RANGE = (0.0, 100.0)
+# Largest plausible gap in percentage points between London and the UK
+MAX_REGION_GAP = 15.0
+# Failing rows listed per check in the report
+MAX_EXAMPLES = 5
+
+Rule = namedtuple('Rule', [
+    'name',         # report key
+    'severity',     # 'error' fails the database build, 'warning' does not
+    'description',  # what a failure means
+    'check',        # function(frame) -> frame of failing rows
+])
+
+
+def period_years(time):
+    """End year of each period label, e.g. 2021 for 'Jan 2021-Dec 2021'
+
+    Labels without a trailing year give NaN.
+    """
+    return pd.to_numeric(time.astype(str).str.extract(r'(\d{4})$')[0],
+                         errors='coerce')
+
+
+def missing_values(frame, max_fraction=MAX_MISSING):
+    """Series whose fraction of missing rates exceeds max_fraction"""
+    missing = frame['rate'].isna().groupby(
+        [frame[column] for column in SERIES], sort=False).agg(['mean', 'sum'])
+    missing.columns = ['missing_fraction', 'missing']
+    return missing[missing['missing_fraction'] > max_fraction].reset_index()
+
+
+def rate_range(frame, low=RATE_RANGE[0], high=RATE_RANGE[1]):
+    """Rows with a rate outside [low, high] or a negative interval"""
+    bad = ((frame['rate'] < low) | (frame['rate'] > high)
+           | (frame['conf'] < 0))
+    return frame[bad]
+
+
+def monotonic_periods(frame):
+    """Rows whose period is unreadable or not after the series' last one"""
+    years = period_years(frame['time'])
+    previous = years.groupby([frame[column] for column in SERIES],
+                             sort=False).shift()
+    bad = (years.isna() & frame['rate'].notna()) | (years <= previous)
+    return frame[bad]
+
+
+def region_pairs(frame, regions=('UK', 'LDN')):
+    """Rates of each series and period side by side for two regions"""
+    pairs = frame[frame['region'].isin(regions)].pivot_table(
+        index=['dimension', 'category', 'time'], columns='region',
+        values='rate', aggfunc='first')
+    return pairs.reindex(columns=list(regions))
+
+
+def region_gap(frame, max_gap=MAX_REGION_GAP):
+    """Periods where London and the UK differ by more than max_gap points"""
+    pairs = region_pairs(frame)
+    pairs['gap'] = (pairs['LDN'] - pairs['UK']).abs()
+    return pairs[pairs['gap'] > max_gap].reset_index()
+
+
+def region_coverage(frame):
+    """Series and periods with a rate for only one of London and the UK"""
+    pairs = region_pairs(frame).notna()
+    return pairs[pairs['UK'] != pairs['LDN']].reset_index()
+
+
+RULES = [
+    Rule('missing_values', 'error',
+         f'More than {MAX_MISSING:.0%} of a series\' rates are missing',
+         missing_values),
+    Rule('rate_range', 'error',
+         f'Rate outside {RATE_RANGE[0]:g}-{RATE_RANGE[1]:g}% or a negative '
+         'confidence interval', rate_range),
+    Rule('monotonic_periods', 'error',
+         'Period label unreadable or not later than the previous period',
+         monotonic_periods),
+    Rule('region_gap', 'error',
+         f'London and UK rates differ by more than {MAX_REGION_GAP:g} points',
+         region_gap),
+    Rule('region_coverage', 'warning',
+         'Reported for only one of London and the UK', region_coverage),
+]
+
+
+def validate(frame, rules=RULES):
+    """Run every rule over a long frame
+
+    Args:
+        frame (pd.DataFrame): Rows with the columns in COLUMNS
+        rules (list): Rules to run
+
+    Returns:
+        dict: JSON-serializable report; 'passed' is False if any error
+            rule found failing rows
+    """
+    checks = []
+    for rule in rules:
+        failures = rule.check(frame)
+        examples = failures.head(MAX_EXAMPLES).astype(object)
+        checks.append({
+            'rule': rule.name,
+            'severity': rule.severity,
+            'description': rule.description,
+            'failures': len(failures),
+            'examples': examples.where(examples.notna(), None).to_dict(
+                'records'),
+        })
+    return {
+        'rows': len(frame),
+        'passed': not any(check['failures'] for check in checks
+                          if check['severity'] == 'error'),
+        'checks': checks,
+    }
+
+
+def to_json(report):
+    """The report as indented JSON"""
+    return json.dumps(report, indent=2, default=str)
+
+
+def summary(report):
+    """One line per check, for console output"""
+    lines = [f"{report['rows']} values checked: "
+             f"{'passed' if report['passed'] else 'FAILED'}"]
+    for check in report['checks']:
+        status = 'ok' if not check['failures'] else (
+            f"{check['failures']} {check['severity']}(s)")
+        lines.append(f"  {check['rule']}: {status}")
+    return '\n'.join(lines)
+
+
+def workbook_frame(frames, sheets=SHEETS):
+    """Long frame of every block of the extracted workbook sheets
+
+    Period rows with no rate at all (blank rows) and footnotes are dropped,
+    as the old per-frame dropna(how='all') did.
+    """
+    rows = breakdown_rows(frames, sheets, dropna=False)
+    has_rate = rows['rate'].notna().groupby(
+        [rows['dimension'], rows['region'], rows['time']],
+        sort=False).transform('any')
+    return rows.loc[has_rate, COLUMNS].reset_index(drop=True)
+
+
+def wide_frame(df, dimension, region=None):
+    """Long frame of a wide CSV with a 'time' column and a column per member
+
+    With region set, the columns are categories of that region; otherwise
+    the columns are the regions themselves and the category is 'All'.
+    """
+    long = df.melt(id_vars='time', var_name='member', value_name='rate')
+    return pd.DataFrame({
+        'dimension': dimension,
+        'region': long['member'] if region is None else region,
+        'category': 'All' if region is None else long['member'],
+        'time': long['time'],
+        'rate': pd.to_numeric(long['rate'], errors='coerce'),
+        'conf': float('nan'),
+    })
+
+
+def source_frame(gender_csv='q1_gender.csv', region_csv='q2_region.csv',
+                 breakdown_csv='q3_breakdown.csv'):
+    """Long frame of the database build's source CSVs
+
+    The gender CSV holds London's male and female rates. Missing files are
+    skipped, as the build skips them.
+    """
+    parts = []
+    if os.path.exists(gender_csv):
+        parts.append(wide_frame(pd.read_csv(gender_csv), 'Gender',
+                                REGION_CODES['London']))
+    if os.path.exists(region_csv):
+        parts.append(wide_frame(pd.read_csv(region_csv), 'Region'))
+    if os.path.exists(breakdown_csv):
+        parts.append(pd.read_csv(breakdown_csv)[COLUMNS])
+    if not parts:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Check the unemployment workbook against the data-quality rules')
+    parser.add_argument('workbook', nargs='?', default=WORKBOOK)
+    parser.add_argument('--output', help='also write the JSON report here')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = validate(workbook_frame(extract_workbook(args.workbook)))
+    print(to_json(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(to_json(report))
+    return 0 if report['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Production entry point for the dashboard.
+
+Exposes the Flask server behind the Dash app as ``server`` (and
+``application``) for any WSGI server, e.g.::
+
+    gunicorn -c gunicorn.conf.py            # multi-process, see gunicorn.conf.py
+    python wsgi.py                          # multi-threaded waitress server
+
+Importing this module warms the data snapshot and the figure cache. With a
+pre-forking server (gunicorn's preload_app) that happens once in the master,
+so every worker starts with the loaded frames and rendered figures shared
+copy-on-write instead of loading its own.
+"""
+import gc
+
+import charts
+import dash_app
+import dashboard_data
+import data_access
+import serving
+
+server = dash_app.app.server
+application = server
+
+
+def warm_up():
+    """Load the dashboard data and render every figure into the cache."""
+    # Refuse to start on a missing or outdated database
+    data_access.check_schema()
+    # refresh() rather than get(): the store's refresh thread would not
+    # survive fork(), so each worker starts its own on first use
+    snapshot = dashboard_data.store.refresh()
+    for spec in charts.CHARTS:
+        if spec.client_side:
+            # Every variant the page load asks for, the cleared dropdown's too
+            charts.render_variants(snapshot, spec.key)
+        else:
+            for value in charts.control_values(spec):
+                charts.render(snapshot, spec.key, value)
+
+    # Connections must not cross fork(); workers open their own
+    data_access.get_pool().close_all()
+    # Keep the warmed objects out of the collector's reach so workers do not
+    # touch (and copy) their pages during garbage collection
+    gc.freeze()
+
+
+warm_up()
+
+
+if __name__ == '__main__':
+    from waitress import serve
+    serve(server, host=serving.HOST, port=serving.PORT,
+          threads=serving.THREADS)